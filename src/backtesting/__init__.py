@@ -3,17 +3,23 @@ Backtesting module for candlestick pattern strategies
 """
 from .engulfing_backtester import EngulfingBacktester
 from .portfolio import Portfolio
-from .position import Position
+from .position import Position, OpenPosition, ClosedPosition
+from .position_book import PositionBook
 from .performance import PerformanceMetrics
-from .signals import TradingSignal, EngulfingSignal
+from .signals import TradingSignal, EngulfingSignal, engulfing_signals, generate_signals_multi
 from .config import BacktestConfig
 
 __all__ = [
     'EngulfingBacktester',
     'Portfolio',
     'Position',
+    'OpenPosition',
+    'ClosedPosition',
+    'PositionBook',
     'PerformanceMetrics',
     'TradingSignal',
     'EngulfingSignal',
+    'engulfing_signals',
+    'generate_signals_multi',
     'BacktestConfig'
 ]
@@ -2,6 +2,7 @@
 Configuration parameters for the backtesting system
 """
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class BacktestConfig:
@@ -14,6 +15,14 @@ class BacktestConfig:
     # Risk management
     stop_loss_pct: float = 0.05           # 5% stop loss
     stop_win_pct: float = 0.20            # 20% stop win
+    intraday_stops: bool = False          # trigger stops on high/low, fill at the stop (open on a gap)
 
     # Trading costs
     commission_bps: float = 10.0          # 10 basis points commission
+
+    # Parallelism
+    max_workers: Optional[int] = None     # worker processes (None = all cores)
+    parallel_symbols: bool = False        # run each stock's day loop in its own worker
+
+    # Output
+    verbose: bool = False                 # print per-stock loading and trade events
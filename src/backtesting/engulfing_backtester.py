@@ -1,16 +1,48 @@
 """
 Main backtesting engine for engulfing patterns
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
+import numpy as np
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import os
 
 from .config import BacktestConfig
 from .portfolio import Portfolio
-from .signals import TradingSignal, EngulfingSignal
+from .signals import TradingSignal, EngulfingSignal, engulfing_signals, generate_signals_multi
 from .performance import PerformanceMetrics
-from .position import ExitReason
+from .position import ExitReason, EXIT_REASONS, PATTERN_EXIT, STOP_LOSS
+from .exit_engine import run_symbol_trades, NO_EXIT
+from .position_book import stop_fill_prices
+
+# Event log labels indexed by exit reason code (stop codes match PositionBook.check_stops)
+_EXIT_EVENTS = ('PATTERN EXIT', 'STOP LOSS', 'STOP WIN')
+
+# Signal type codes: bullish +1, bearish -1 (anything else 0, ignored)
+_SIGNAL_CODES = {'bullish': 1, 'bearish': -1}
+
+# Event log labels for opened positions indexed by signal code
+_OPEN_EVENTS = (None, 'OPENED LONG', 'OPENED SHORT')
+
+# Event log labels emitted by the signal pass (after that day's stop exits)
+_SIGNAL_EVENTS = frozenset(['PATTERN EXIT', 'OPENED LONG', 'OPENED SHORT'])
+
+# Columns loaded from the per-stock files (everything else is dropped at parse time)
+_OHLCV_COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+_PRICE_DTYPES = {'open': 'float64', 'high': 'float64', 'low': 'float64', 'close': 'float64'}
+
+# Per-stock file suffixes in order of preference (Parquet from the downloader, legacy CSV)
+_STOCK_FILE_SUFFIXES = ('_daily.parquet', '_daily.csv')
+
+def _list_stock_files(data_directory: str) -> Dict[str, str]:
+    """Map each symbol to its data file name, preferring Parquet over CSV"""
+    stock_files = {}
+    for suffix in reversed(_STOCK_FILE_SUFFIXES):
+        for file_name in os.listdir(data_directory):
+            if file_name.endswith(suffix):
+                stock_files[file_name[:-len(suffix)]] = file_name
+    return stock_files
 
 class EngulfingBacktester:
     """Main backtesting engine for engulfing patterns"""
@@ -20,54 +52,114 @@ class EngulfingBacktester:
         self.config = config
         self.signal_generator = signal_generator or EngulfingSignal()
         self.portfolio = Portfolio(config)
-        self.performance = PerformanceMetrics()
-        self._signals_cache = {}  # Cache for generated signals
+        self.performance = PerformanceMetrics(self.portfolio.book, self.portfolio.closed_rows)
+        self._signals_by_day: Dict = {}  # day key -> [(symbol, signal row)] across all stocks
+        self._day_arr: Dict[str, np.ndarray] = {}  # symbol -> sorted int64 day keys
+        self._close_arr: Dict[str, np.ndarray] = {}  # symbol -> closes aligned with _day_arr
+        self._open_arr: Dict[str, np.ndarray] = {}  # symbol -> opens (intraday stops only)
+        self._high_arr: Dict[str, np.ndarray] = {}  # symbol -> highs (intraday stops only)
+        self._low_arr: Dict[str, np.ndarray] = {}  # symbol -> lows (intraday stops only)
+        self._calendar_row: Dict[int, int] = {}  # day key -> row of the price matrices
+        self._close_matrix: Optional[np.ndarray] = None  # trading day x symbol id closes (NaN = no bar)
+        self._open_matrix: Optional[np.ndarray] = None
+        self._high_matrix: Optional[np.ndarray] = None
+        self._low_matrix: Optional[np.ndarray] = None
+        self.events: List[Tuple] = []  # (day key, symbol, event, price) trade log
 
     def run_backtest(self, data_directory: str) -> Dict:
         """
         Run backtest with chronological day-by-day processing
 
         Args:
-            data_directory: Path to directory containing stock CSV files
+            data_directory: Path to directory containing stock Parquet/CSV files
 
         Returns:
             Dictionary containing backtest results
         """
-        # Get list of all stock files
-        stock_files = [f for f in os.listdir(data_directory) if f.endswith('_daily.csv')]
-        stock_files.sort()  # Ensure consistent processing order
+        # Get list of all stock files, sorted by symbol for a consistent processing order
+        stock_files = sorted(_list_stock_files(data_directory).items())
 
         print(f"Found {len(stock_files)} stock files to process...")
 
+        if self.config.parallel_symbols:
+            return self._run_backtest_by_symbol(data_directory, stock_files)
+
         # Load all stock data first
         all_stock_data = {}
-        all_trading_days = set()
 
-        for i, stock_file in enumerate(stock_files, 1):
-            symbol = stock_file.replace('_daily.csv', '')
-            print(f"Loading data for {symbol} ({i}/{len(stock_files)})...")
+        for i, (symbol, stock_file) in enumerate(stock_files, 1):
+            if self.config.verbose:
+                print(f"Loading data for {symbol} ({i}/{len(stock_files)})...")
 
             stock_data = self._load_stock_data(os.path.join(data_directory, stock_file))
             all_stock_data[symbol] = stock_data
+            self._index_stock_data(symbol, stock_data)
 
-            # Add all dates to unified timeline
-            all_trading_days.update(stock_data['date'].dt.date)
+        # Generate signals for all stocks up front (independent per stock)
+        print(f"Generating signals for {len(all_stock_data)} stocks...")
+        self._generate_all_signals(all_stock_data)
 
-        # Sort trading days chronologically
-        trading_days = sorted(list(all_trading_days))
-        print(f"Processing {len(trading_days)} trading days from {trading_days[0]} to {trading_days[-1]}")
+        # Unified, sorted timeline (int64 day keys) of every day any stock traded
+        trading_days = self._build_calendar()
+        print(f"Processing {len(trading_days)} trading days from "
+              f"{self._format_day(trading_days[0])} to {self._format_day(trading_days[-1])}")
         print("-" * 60)
 
-        # Process day by day
-        for i, trading_day in enumerate(trading_days, 1):
-            current_date = pd.Timestamp(trading_day)
-            print(f"Processing day {i}/{len(trading_days)}: {current_date.strftime('%Y-%m-%d')}")
+        # Process day by day (progress reported at ~1% intervals)
+        progress_step = max(1, len(trading_days) // 100)
+        for i, day in enumerate(trading_days, 1):
+            if i % progress_step == 0 or i == len(trading_days):
+                print(f"Processing day {i}/{len(trading_days)}: {self._format_day(day)}")
 
             # Check stops for all open positions on this day
-            self._check_all_stops_on_date(current_date, all_stock_data)
+            self._check_all_stops_on_date(day)
 
             # Process signals for all stocks on this day
-            self._process_all_signals_on_date(current_date, all_stock_data)
+            self._process_all_signals_on_date(day)
+
+        return self._finalize_results()
+
+    def _run_backtest_by_symbol(self, data_directory: str, stock_files: List[Tuple[str, str]]) -> Dict:
+        """
+        Run each stock's day loop independently in worker processes
+
+        Positions are sized from initial capital and never compete for cash, so
+        every stock's backtest is independent. Worker results are merged back
+        into this backtester in the order the chronological loop produces them.
+        """
+        symbols = [symbol for symbol, _ in stock_files]
+        file_paths = [os.path.join(data_directory, stock_file) for _, stock_file in stock_files]
+        print(f"Backtesting {len(symbols)} stocks in parallel...")
+
+        with ProcessPoolExecutor(max_workers=self.config.max_workers) as executor:
+            results = list(executor.map(
+                _backtest_symbol,
+                [self.config] * len(symbols),
+                [self.signal_generator] * len(symbols),
+                symbols,
+                file_paths
+            ))
+
+        # Symbol ids follow the sorted symbol order, as in the chronological loop
+        self.portfolio.symbol_ids.update((symbol, i) for i, symbol in enumerate(symbols))
+
+        parts = []
+        for symbol_index, (part, events) in enumerate(results):
+            parts.append(part)
+            self.events.extend(_event_order(symbol_index, events))
+
+        # Book rows in opening order, closed rows in the day loop's exit order
+        self.portfolio.merge(parts)
+
+        self.events.sort(key=lambda item: item[0])
+        self.events = [event for _, event in self.events]
+
+        return self._finalize_results()
+
+    def _finalize_results(self) -> Dict:
+        """Print buffered events and compute final metrics plus portfolio summary"""
+        if self.config.verbose:
+            self.print_events()
 
         # Calculate final performance
         results = self.performance.calculate_metrics()
@@ -75,103 +167,173 @@ class EngulfingBacktester:
         # Add portfolio summary
         results['portfolio'] = {
             'final_cash': self.portfolio.cash,
-            'final_positions': len(self.portfolio.positions),
-            'total_closed_positions': len(self.portfolio.closed_positions)
+            'final_positions': len(self.portfolio.open_rows),
+            'total_closed_positions': len(self.portfolio.closed_rows)
         }
 
         return results
 
     def _load_stock_data(self, file_path: str) -> pd.DataFrame:
-        """Load stock OHLCV data"""
-        data = pd.read_csv(file_path)
-        data['date'] = pd.to_datetime(data['date'])
+        """Load stock OHLCV data from a Parquet or CSV file"""
+        if file_path.endswith('.parquet'):
+            # Columnar read of just the needed columns; prices widen from float32 storage
+            data = pd.read_parquet(file_path, columns=list(_OHLCV_COLUMNS))
+            data['date'] = pd.to_datetime(data['date'])
+            data = data.astype(_PRICE_DTYPES)
+        else:
+            # Parse dates inside the C reader and skip any column the backtest never reads
+            data = pd.read_csv(
+                file_path,
+                usecols=lambda column: column in _OHLCV_COLUMNS,
+                parse_dates=['date'],
+                dtype=_PRICE_DTYPES,
+            )
+        # Downloaded files are already in date order
+        if data['date'].is_monotonic_increasing:
+            return data
         return data.sort_values('date').reset_index(drop=True)
 
-    def _check_all_stops_on_date(self, current_date: datetime, all_stock_data: Dict[str, pd.DataFrame]):
-        """Check stops for all open positions on a specific date"""
-
-        for symbol, position in list(self.portfolio.positions.items()):
-            # Get price data for this symbol on this date
-            stock_data = all_stock_data[symbol]
-            day_data = stock_data[stock_data['date'].dt.date == current_date.date()]
-
-            if day_data.empty:
-                continue
-
-            current_price = day_data.iloc[0]['close']
-
-            # Check stop loss
-            if position.check_stop_loss(current_price):
-                self.portfolio.close_position(
-                    symbol, current_date, current_price, ExitReason.STOP_LOSS
-                )
-                trade_data = position.to_dict()
-                self.performance.add_trade(trade_data)
-                print(f"  STOP LOSS: {symbol} closed at {current_price:.2f}")
-                continue
-
-            # Check stop win
-            if position.check_stop_win(current_price):
-                self.portfolio.close_position(
-                    symbol, current_date, current_price, ExitReason.STOP_WIN
-                )
-                trade_data = position.to_dict()
-                self.performance.add_trade(trade_data)
-                print(f"  STOP WIN: {symbol} closed at {current_price:.2f}")
-                continue
-
-    def _process_all_signals_on_date(self, current_date: datetime, all_stock_data: Dict[str, pd.DataFrame]):
-        """Process all signals for a specific date across all stocks"""
-
-        for symbol, stock_data in all_stock_data.items():
-            # Check if this stock has data for this date
-            day_data = stock_data[stock_data['date'].dt.date == current_date.date()]
-            if day_data.empty:
-                continue
-
-            # Generate signals for this stock (if not already done)
-            if symbol not in self._signals_cache:
-                self._signals_cache[symbol] = self.signal_generator.generate_signals(stock_data)
-
-            signals = self._signals_cache[symbol]
-
-            # Get signals for this specific date
-            day_signals = signals[signals['date'].dt.date == current_date.date()]
-
-            if day_signals.empty:
-                continue
-
-            # Process signals for this day
-            for _, signal in day_signals.iterrows():
-                signal_date = signal['date']
-                signal_type = signal['signal_type']
-                signal_price = signal['price']
-                signal_volume = signal['volume']
-
-                # Check if we already have a position in this stock
-                if symbol in self.portfolio.positions:
-                    current_position = self.portfolio.positions[symbol]
-
-                    # Check if this signal is opposite to our current position
-                    if (current_position.position_type.value == 'long' and signal_type == 'bearish') or \
-                       (current_position.position_type.value == 'short' and signal_type == 'bullish'):
-
-                        # Close position due to opposite pattern
-                        self.portfolio.close_position(
-                            symbol, signal_date, signal_price, ExitReason.PATTERN_EXIT
-                        )
-                        trade_data = current_position.to_dict()
-                        self.performance.add_trade(trade_data)
-                        print(f"  PATTERN EXIT: {symbol} closed at {signal_price:.2f}")
-
-                # Check if we can open a new position (only if no existing position)
-                elif not self.portfolio.has_position_in_stock(symbol):
-                    if signal_type == 'bullish':
-                        if self.portfolio.open_long_position(symbol, signal_date, signal_price, signal_volume):
-                            print(f"  OPENED LONG: {symbol} at {signal_price:.2f}")
-                    elif signal_type == 'bearish':
-                        if self.portfolio.open_short_position(symbol, signal_date, signal_price, signal_volume):
-                            print(f"  OPENED SHORT: {symbol} at {signal_price:.2f}")
+    @staticmethod
+    def _day_keys(dates: pd.Series) -> np.ndarray:
+        """Convert a datetime column to int64 day keys (days since epoch)"""
+        return dates.to_numpy().astype('datetime64[D]').view('int64')
+
+    @staticmethod
+    def _day_key(date: datetime) -> int:
+        """Convert a single date to its int64 day key"""
+        return int(np.datetime64(date, 'D').view('int64'))
+
+    @staticmethod
+    def _format_day(day: int) -> str:
+        """Format an int64 day key as YYYY-MM-DD (only needed for output)"""
+        return str(np.datetime64(day, 'D'))
+
+    def _index_stock_data(self, symbol: str, stock_data: pd.DataFrame):
+        """Keep sorted day keys and prices so the daily loop avoids DataFrame scans"""
+        self._day_arr[symbol] = self._day_keys(stock_data['date'])
+        self._close_arr[symbol] = stock_data['close'].to_numpy()
+        if self.config.intraday_stops:
+            self._open_arr[symbol] = stock_data['open'].to_numpy()
+            self._high_arr[symbol] = stock_data['high'].to_numpy()
+            self._low_arr[symbol] = stock_data['low'].to_numpy()
+
+    def _build_calendar(self) -> List[int]:
+        """
+        Build the unified trading calendar and dense price matrices over it
+
+        Column j of a matrix holds the prices of the stock with portfolio
+        symbol id j, so open positions' prices can be gathered in one take.
+
+        Each matrix is trading days x symbols float64: 8 bytes per cell, e.g.
+        ~20 MB for 20 years of 500 stocks. One matrix (closes) is built, or
+        four with intraday stops; very wide universes should use
+        parallel_symbols, which keeps per-symbol arrays instead.
+
+        Returns:
+            Sorted list of int64 day keys on which any stock traded
+        """
+        trading_days = np.unique(np.concatenate(list(self._day_arr.values())))
+        symbol_ids = self.portfolio.symbol_ids
+        for symbol in self._day_arr:
+            symbol_ids.setdefault(symbol, len(symbol_ids))
+
+        rows = {symbol: trading_days.searchsorted(days) for symbol, days in self._day_arr.items()}
+
+        def dense(values_by_symbol: Dict[str, np.ndarray]) -> np.ndarray:
+            matrix = np.full((len(trading_days), len(symbol_ids)), np.nan)
+            for symbol, values in values_by_symbol.items():
+                matrix[rows[symbol], symbol_ids[symbol]] = values
+            return matrix
+
+        self._close_matrix = dense(self._close_arr)
+        if self.config.intraday_stops:
+            self._open_matrix = dense(self._open_arr)
+            self._high_matrix = dense(self._high_arr)
+            self._low_matrix = dense(self._low_arr)
+
+        trading_days = trading_days.tolist()
+        self._calendar_row = {day: row for row, day in enumerate(trading_days)}
+        return trading_days
+
+    def _generate_all_signals(self, all_stock_data: Dict[str, pd.DataFrame]):
+        """Generate signals for every stock in parallel worker processes"""
+        # Workers detect on their own copies, so the plain EngulfingSignal's cache
+        # could never hit there; ship the module-level function instead
+        signal_fn = self.signal_generator.generate_signals
+        if type(self.signal_generator) is EngulfingSignal:
+            signal_fn = engulfing_signals
+        all_signals = generate_signals_multi(all_stock_data, signal_fn, self.config.max_workers)
+        for symbol, signals in all_signals.items():
+            self._index_signals(symbol, signals)
+
+    def _index_signals(self, symbol: str, signals: pd.DataFrame):
+        """Add a stock's signals to the day-keyed event index used by the day loop"""
+        if signals.empty:
+            return
+
+        signal_days = self._day_keys(signals['date']).tolist()
+        signal_codes = signals['signal_type'].map(_SIGNAL_CODES).fillna(0).astype('int8').tolist()
+        for day, signal in zip(signal_days, zip(signals['date'], signal_codes,
+                                                signals['price'].tolist(), signals['volume'].tolist())):
+            self._signals_by_day.setdefault(day, []).append((symbol, signal))
+
+    def _check_all_stops_on_date(self, day: int):
+        """Check stops for all open positions on a specific day key"""
+
+        rows = self.portfolio.open_row_array()
+        if not len(rows):
+            return
+
+        # Gather today's prices for every open position and check all stops at once
+        book = self.portfolio.book
+        row = self._calendar_row[day]
+        symbol_ids = book.column('symbol_id')[rows]
+        if self.config.intraday_stops:
+            exit_codes, prices = book.check_intraday_stops(
+                rows, self._open_matrix[row, symbol_ids], self._high_matrix[row, symbol_ids],
+                self._low_matrix[row, symbol_ids]
+            )
+        else:
+            prices = self._close_matrix[row, symbol_ids]
+            exit_codes = book.check_stops(rows, prices)
+        hits = np.flatnonzero(exit_codes)
+        symbols = book.column('symbol')
+        closes = [(symbols[rows[k]], float(prices[k]), int(exit_codes[k])) for k in hits.tolist()]
+
+        if not closes:
+            return
+
+        # Build the exit timestamp only when a stop actually fires
+        exit_date = pd.Timestamp(day, unit='D')
+        for symbol, current_price, exit_code in closes:
+            self.portfolio.close_position(symbol, exit_date, current_price, EXIT_REASONS[exit_code])
+            self.events.append((day, symbol, _EXIT_EVENTS[exit_code], current_price))
+
+    def _process_all_signals_on_date(self, day: int):
+        """Process all signals for a specific day key across all stocks"""
+
+        # Only stocks with a signal today are visited (indexed in symbol order)
+        for symbol, (signal_date, sig_i8, signal_price, signal_volume) in self._signals_by_day.get(day, ()):
+            # Check if we already have a position in this stock
+            position_type = self.portfolio.position_type(symbol)
+            if position_type:
+                # Check if this signal is opposite to our current position
+                if position_type * sig_i8 < 0:
+
+                    # Close position due to opposite pattern
+                    self.portfolio.close_position(symbol, signal_date, signal_price, ExitReason.PATTERN_EXIT)
+                    self.events.append((day, symbol, _EXIT_EVENTS[PATTERN_EXIT], signal_price))
+
+            # Open a new position (only if no existing position): +1 long, -1 short
+            elif sig_i8:
+                open_position = self.portfolio.open_long_position if sig_i8 > 0 else self.portfolio.open_short_position
+                if open_position(symbol, signal_date, signal_price, signal_volume):
+                    self.events.append((day, symbol, _OPEN_EVENTS[sig_i8], signal_price))
+
+    def print_events(self):
+        """Print the buffered trade event log"""
+        for day, symbol, event, price in self.events:
+            print(f"  {self._format_day(day)} {event}: {symbol} at {price:.2f}")
 
     def get_portfolio_summary(self) -> Dict:
         """Get current portfolio summary"""
@@ -181,6 +343,85 @@ class EngulfingBacktester:
             'cash': self.portfolio.cash,
             'open_long_positions': long_count,
             'open_short_positions': short_count,
-            'total_open_positions': len(self.portfolio.positions),
-            'closed_positions': len(self.portfolio.closed_positions)
+            'total_open_positions': len(self.portfolio.open_rows),
+            'closed_positions': len(self.portfolio.closed_rows)
         }
+
+
+def _event_order(symbol_index: int, events: List[Tuple]) -> List[Tuple]:
+    """
+    Key one stock's events by their position in the chronological loop's log
+
+    Each day logs stop exits first, in position opening order (entry day,
+    then symbol order), then signal events in symbol order. Events of one
+    stock that share a key keep their relative order under a stable sort.
+    """
+    keyed = []
+    entry_day = None
+    for event in events:
+        day, _, label, _ = event
+        if label in _SIGNAL_EVENTS:
+            if label != 'PATTERN EXIT':
+                entry_day = day
+            keyed.append(((day, 1, symbol_index, 0), event))
+        else:
+            keyed.append(((day, 0, entry_day, symbol_index), event))
+    return keyed
+
+def _backtest_symbol(config: BacktestConfig, signal_generator: TradingSignal,
+                     symbol: str, file_path: str) -> Tuple[Tuple, List]:
+    """Backtest a single stock with the array exit engine (worker process entry point)"""
+    backtester = EngulfingBacktester(config, signal_generator)
+    portfolio = backtester.portfolio
+    stock_data = backtester._load_stock_data(file_path)
+    days = backtester._day_keys(stock_data['date'])
+    dates = stock_data['date']
+    close = stock_data['close'].to_numpy()
+
+    # Signals aligned to bars: code, price and volume per bar (code 0 = no signal)
+    signal_codes = np.zeros(len(close), dtype=np.int8)
+    signal_prices = close.copy()
+    signal_volumes = np.zeros(len(close))
+    signals = signal_generator.generate_signals(stock_data)
+    if not signals.empty:
+        signal_days = backtester._day_keys(signals['date'])
+        bars = np.minimum(days.searchsorted(signal_days), len(days) - 1)
+        on_bar = days[bars] == signal_days
+        bars = bars[on_bar]
+        signal_codes[bars] = signals['signal_type'].map(_SIGNAL_CODES).fillna(0).to_numpy()[on_bar]
+        signal_prices[bars] = signals['price'].to_numpy()[on_bar]
+        signal_volumes[bars] = signals['volume'].to_numpy()[on_bar]
+
+    open_ = high = low = None
+    if config.intraday_stops:
+        open_ = stock_data['open'].to_numpy()
+        high, low = stock_data['high'].to_numpy(), stock_data['low'].to_numpy()
+    trades = run_symbol_trades(close, signal_codes, signal_prices,
+                               config.stop_loss_pct, config.stop_win_pct, high, low)
+
+    # Replay the trades through the portfolio so positions and events match the day loop
+    for entry_bar, exit_bar, exit_code in trades:
+        sig_i8 = int(signal_codes[entry_bar])
+        entry_price = float(signal_prices[entry_bar])
+        open_position = portfolio.open_long_position if sig_i8 > 0 else portfolio.open_short_position
+        open_position(symbol, dates.iat[entry_bar], entry_price, float(signal_volumes[entry_bar]))
+        backtester.events.append((int(days[entry_bar]), symbol, _OPEN_EVENTS[sig_i8], entry_price))
+
+        if exit_code == NO_EXIT:
+            continue
+
+        # Pattern exits fill at the signal price, stops at the close (or the stop price intraday,
+        # the open if the bar gapped through it)
+        if exit_code == PATTERN_EXIT:
+            exit_price = float(signal_prices[exit_bar])
+        elif config.intraday_stops:
+            row = portfolio.open_rows[symbol]
+            is_stop_loss = exit_code == STOP_LOSS
+            stop_price = portfolio.book.column('sl_price' if is_stop_loss else 'sw_price')[row]
+            exit_price = float(stop_fill_prices(sig_i8, is_stop_loss, stop_price, open_[exit_bar]))
+        else:
+            exit_price = float(close[exit_bar])
+        portfolio.close_position(symbol, dates.iat[exit_bar], exit_price, EXIT_REASONS[exit_code])
+        backtester.events.append((int(days[exit_bar]), symbol, _EXIT_EVENTS[exit_code], exit_price))
+
+    return portfolio.export_rows(), backtester.events
@@ -0,0 +1,91 @@
+"""
+Array-based exit engine for a single stock's position sequence
+"""
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .position import PATTERN_EXIT, STOP_LOSS, STOP_WIN
+
+# Exit code for a position that is still open at the last bar
+NO_EXIT = -1
+
+def find_exit(close: np.ndarray, signal_codes: np.ndarray, start: int, position_type: int,
+              sl_level: float, sw_level: float, high: Optional[np.ndarray] = None,
+              low: Optional[np.ndarray] = None) -> Tuple[int, int]:
+    """
+    Find the first bar from `start` on which an open position exits
+
+    Bars are scanned in doubling windows so short holds only touch a few
+    elements. Stops are checked before an opposite signal on the same bar,
+    matching the chronological backtest.
+
+    Args:
+        close: Closing prices per bar
+        signal_codes: Signal code per bar (+1 bullish, -1 bearish, 0 none)
+        start: First bar to check
+        position_type: +1 long, -1 short
+        sl_level, sw_level: Direction-signed stop trigger levels
+        high, low: Bar highs/lows to trigger stops intraday (closes if omitted)
+
+    Returns:
+        (exit bar, exit reason code), or (-1, NO_EXIT) if the position is still open
+    """
+    # Prices that trigger each stop: the adverse/favorable extreme intraday, else the close
+    if high is None:
+        adverse = favorable = close
+    else:
+        adverse, favorable = (low, high) if position_type > 0 else (high, low)
+
+    n = len(close)
+    window = 64
+    while start < n:
+        stop = min(n, start + window)
+        hit_sl = position_type * adverse[start:stop] <= sl_level
+        hit_sw = position_type * favorable[start:stop] >= sw_level
+        hit = hit_sl | hit_sw | (signal_codes[start:stop] == -position_type)
+        if hit.any():
+            k = int(hit.argmax())
+            if hit_sl[k]:
+                return start + k, STOP_LOSS
+            if hit_sw[k]:
+                return start + k, STOP_WIN
+            return start + k, PATTERN_EXIT
+        start = stop
+        window *= 2
+    return -1, NO_EXIT
+
+def run_symbol_trades(close: np.ndarray, signal_codes: np.ndarray, signal_prices: np.ndarray,
+                      stop_loss_pct: float, stop_win_pct: float, high: Optional[np.ndarray] = None,
+                      low: Optional[np.ndarray] = None) -> List[Tuple[int, int, int]]:
+    """
+    Replay one stock's signals into its sequence of trades
+
+    A position opens on the first signal while flat. A stop exit frees the
+    stock for a signal on the same bar; a pattern exit does not.
+
+    Returns:
+        List of (entry bar, exit bar, exit reason code); the last trade may
+        still be open (exit bar -1, NO_EXIT)
+    """
+    trades = []
+    open_bars = np.flatnonzero(signal_codes)
+    start = 0
+    while True:
+        k = open_bars.searchsorted(start)
+        if k == len(open_bars):
+            break
+
+        entry_bar = int(open_bars[k])
+        position_type = int(signal_codes[entry_bar])
+        entry_price = signal_prices[entry_bar]
+        sl_level = position_type * (entry_price * (1 - position_type * stop_loss_pct))
+        sw_level = position_type * (entry_price * (1 + position_type * stop_win_pct))
+
+        exit_bar, exit_code = find_exit(close, signal_codes, entry_bar + 1, position_type,
+                                        sl_level, sw_level, high, low)
+        trades.append((entry_bar, exit_bar, exit_code))
+        if exit_code == NO_EXIT:
+            break
+        start = exit_bar + 1 if exit_code == PATTERN_EXIT else exit_bar
+
+    return trades
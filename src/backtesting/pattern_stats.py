@@ -3,31 +3,41 @@ Pattern Statistics Utility - Simplified Version
 """
 import pandas as pd
 import numpy as np
-from scipy.stats import ttest_1samp
+from scipy.stats import t as t_dist
+
+
+def _return_stats(values: np.ndarray) -> dict:
+    """Mean/std/one-sample t-test (vs 0) for a return array, NaNs ignored"""
+    returns = values[~np.isnan(values)]
+    n = len(returns)
+    mean = returns.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = returns.std(ddof=1) if n > 1 else np.nan
+        t_stat = mean / (std / np.sqrt(n))
+    p_value = 2 * t_dist.sf(np.abs(t_stat), n - 1) if n > 1 else np.nan
+    return {
+        'mean': mean, 'std': std,
+        't_stat': t_stat, 'p_value': p_value,
+        'hit_rate': (returns > 0).mean(), 'n_obs': n
+    }
 
 
 def calculate_pattern_statistics(patterns_df: pd.DataFrame) -> dict:
     """Calculate pattern performance statistics"""
     results = {}
     return_cols = ['forward_1d_return', 'forward_5d_return', 'forward_10d_return']
+    present_cols = [col for col in return_cols if col in patterns_df.columns]
 
-    for pattern in patterns_df['pattern_name'].unique():
-        pattern_data = patterns_df[patterns_df['pattern_name'] == pattern]
+    for pattern, pattern_data in patterns_df.groupby('pattern_name', sort=False):
         pattern_stats = {}
 
-        for col in return_cols:
-            if col in pattern_data.columns:
-                returns = pattern_data[col].dropna()
-                if len(returns) > 0:
-                    t_stat, p_value = ttest_1samp(returns, 0)
-                    pattern_stats[col] = {
-                        'mean': returns.mean(), 'std': returns.std(),
-                        't_stat': t_stat, 'p_value': p_value,
-                        'hit_rate': (returns > 0).mean(), 'n_obs': len(returns)
-                    }
-                else:
-                    pattern_stats[col] = {'mean': np.nan, 'std': np.nan, 't_stat': np.nan,
-                                        'p_value': np.nan, 'hit_rate': np.nan, 'n_obs': 0}
+        for col in present_cols:
+            values = pattern_data[col].to_numpy(dtype=float)
+            if np.count_nonzero(~np.isnan(values)) > 0:
+                pattern_stats[col] = _return_stats(values)
+            else:
+                pattern_stats[col] = {'mean': np.nan, 'std': np.nan, 't_stat': np.nan,
+                                      'p_value': np.nan, 'hit_rate': np.nan, 'n_obs': 0}
         results[pattern] = pattern_stats
     return results
 
@@ -66,14 +76,9 @@ def calculate_aggregate_stats(patterns_df: pd.DataFrame) -> dict:
 
     for col in return_cols:
         if col in patterns_df.columns:
-            returns = patterns_df[col].dropna()
-            if len(returns) > 0:
-                t_stat, p_value = ttest_1samp(returns, 0)
-                agg_stats[col] = {
-                    'mean': returns.mean(), 'std': returns.std(),
-                    't_stat': t_stat, 'p_value': p_value,
-                    'hit_rate': (returns > 0).mean(), 'n_obs': len(returns)
-                }
+            values = patterns_df[col].to_numpy(dtype=float)
+            if np.count_nonzero(~np.isnan(values)) > 0:
+                agg_stats[col] = _return_stats(values)
     return agg_stats
 
 
@@ -3,21 +3,64 @@ Performance metrics calculation for the backtesting system
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import os
 
+from .position import ExitReason, EXIT_REASON_CODES
+from .position_book import PositionBook, TRADE_COLUMNS
+
+POSITION_TYPE_CODES = {'long': 1, 'short': -1}
+
 class PerformanceMetrics:
     """Performance metrics calculator"""
 
-    def __init__(self):
-        self.trades: List[Dict] = []
+    def __init__(self, book: Optional[PositionBook] = None, trade_rows: Optional[List[int]] = None):
+        """
+        Initialize metrics over a completed-trade store
+
+        Args:
+            book: Column store to read completed trades from (e.g. Portfolio.book);
+                a trades-only book of its own if omitted
+            trade_rows: Rows of book holding completed trades, in exit order
+                (e.g. Portfolio.closed_rows, shared, not copied)
+        """
+        if book is None:
+            book = PositionBook(columns=TRADE_COLUMNS)
+        self._trades = book
+        self._trade_rows = trade_rows if trade_rows is not None else []
         self.daily_returns: List[float] = []
         self.daily_dates: List[datetime] = []
 
+        # Lazily built trades DataFrame shared by metrics and exports
+        self._trades_df: Optional[pd.DataFrame] = None
+        self._trades_df_len = 0
+
+    @property
+    def trade_count(self) -> int:
+        """Number of completed trades"""
+        return len(self._trade_rows)
+
     def add_trade(self, trade: Dict):
-        """Add a completed trade to the performance tracking"""
-        self.trades.append(trade)
+        """Add a completed trade (Position.to_dict() layout) to the performance tracking"""
+        record = dict(trade)
+        record['entry_date'] = int(np.datetime64(trade['entry_date'], 'D').view('int64'))
+        record['exit_date'] = int(np.datetime64(trade['exit_date'], 'D').view('int64'))
+        record['position_type'] = POSITION_TYPE_CODES[trade['position_type']]
+        record['exit_reason'] = EXIT_REASON_CODES[ExitReason(trade['exit_reason'])]
+        self.add_trade_record(tuple(record[name] for name in TRADE_COLUMNS))
+
+    def add_trade_record(self, record: Tuple):
+        """Add a completed trade given as a tuple in TRADE_COLUMNS order"""
+        self._trade_rows.append(self._trades.add_trade(record))
+
+    @property
+    def trades_df(self) -> pd.DataFrame:
+        """DataFrame of all completed trades, rebuilt only when trades were added"""
+        if self._trades_df is None or self._trades_df_len != self.trade_count:
+            self._trades_df = self._trades.to_dataframe(self._trade_rows)
+            self._trades_df_len = self.trade_count
+        return self._trades_df
 
     def add_daily_return(self, date: datetime, return_pct: float):
         """Add daily portfolio return"""
@@ -25,23 +68,14 @@ class PerformanceMetrics:
         self.daily_returns.append(return_pct)
 
     def export_detailed_results(self, output_dir: str, results: Dict):
-        """Export detailed results to CSV files"""
+        """Export detailed results (Parquet tables plus a CSV summary)"""
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
 
-        # Export all trades to CSV
-        if self.trades:
-            trades_df = pd.DataFrame(self.trades)
-            trades_df.to_csv(os.path.join(output_dir, 'all_trades.csv'), index=False)
-
-            # Separate long and short trades
-            long_trades = trades_df[trades_df['position_type'] == 'long']
-            short_trades = trades_df[trades_df['position_type'] == 'short']
-
-            if not long_trades.empty:
-                long_trades.to_csv(os.path.join(output_dir, 'long_trades.csv'), index=False)
-            if not short_trades.empty:
-                short_trades.to_csv(os.path.join(output_dir, 'short_trades.csv'), index=False)
+        # Export all trades; long/short are selected via the position_type column
+        if self.trade_count:
+            trades_df = self.trades_df
+            trades_df.to_parquet(os.path.join(output_dir, 'all_trades.parquet'), index=False)
 
         # Export daily returns
         if self.daily_returns:
@@ -49,7 +83,7 @@ class PerformanceMetrics:
                 'date': self.daily_dates,
                 'daily_return_pct': self.daily_returns
             })
-            daily_returns_df.to_csv(os.path.join(output_dir, 'daily_returns.csv'), index=False)
+            daily_returns_df.to_parquet(os.path.join(output_dir, 'daily_returns.parquet'), index=False)
 
         # Export summary metrics - removed Total Return, Sharpe Ratio, Max Drawdown
         summary_data = {
@@ -81,74 +115,65 @@ class PerformanceMetrics:
         summary_df.to_csv(os.path.join(output_dir, 'summary_metrics.csv'), index=False)
 
         # Export trade statistics by symbol
-        if self.trades:
+        if self.trade_count:
             symbol_stats = self._calculate_symbol_statistics()
             symbol_stats_df = pd.DataFrame(symbol_stats)
-            symbol_stats_df.to_csv(os.path.join(output_dir, 'symbol_statistics.csv'), index=False)
+            symbol_stats_df.to_parquet(os.path.join(output_dir, 'symbol_statistics.parquet'), index=False)
 
     def _calculate_symbol_statistics(self) -> List[Dict]:
         """Calculate trading statistics for each symbol"""
-        if not self.trades:
+        if not self.trade_count:
             return []
 
-        trades_df = pd.DataFrame(self.trades)
-        symbol_stats = []
-
-        for symbol in trades_df['symbol'].unique():
-            symbol_trades = trades_df[trades_df['symbol'] == symbol]
-
-            # Calculate metrics for this symbol
-            total_trades = len(symbol_trades)
-            profitable_trades = len(symbol_trades[symbol_trades['return_pct'] > 0])
-            hit_rate = (profitable_trades / total_trades) * 100 if total_trades > 0 else 0.0
-            average_return = symbol_trades['return_pct'].mean()
-            total_return = symbol_trades['return_pct'].sum()
-            best_trade = symbol_trades['return_pct'].max()
-            worst_trade = symbol_trades['return_pct'].min()
-
-            symbol_stats.append({
-                'symbol': symbol,
-                'total_trades': total_trades,
-                'profitable_trades': profitable_trades,
-                'hit_rate': hit_rate,
-                'average_return': average_return,
-                'total_return': total_return,
-                'best_trade': best_trade,
-                'worst_trade': worst_trade
-            })
+        trades_df = self.trades_df
+
+        # One groupby pass over all trades instead of a mask per symbol
+        returns = trades_df['return_pct']
+        symbol_stats = returns.groupby(trades_df['symbol'], sort=False).agg(
+            total_trades='count',
+            average_return='mean',
+            total_return='sum',
+            best_trade='max',
+            worst_trade='min'
+        )
+        symbol_stats['profitable_trades'] = (returns > 0).groupby(trades_df['symbol'], sort=False).sum()
+        symbol_stats['hit_rate'] = (symbol_stats['profitable_trades'] / symbol_stats['total_trades']) * 100
 
-        return symbol_stats
+        columns = ['symbol', 'total_trades', 'profitable_trades', 'hit_rate',
+                   'average_return', 'total_return', 'best_trade', 'worst_trade']
+        return symbol_stats.reset_index()[columns].to_dict('records')
 
     def calculate_metrics(self) -> Dict:
         """Calculate comprehensive performance metrics"""
-        if not self.trades:
+        if not self.trade_count:
             return self._empty_results()
 
-        # Separate long and short trades
-        long_trades = [t for t in self.trades if t['position_type'] == 'long']
-        short_trades = [t for t in self.trades if t['position_type'] == 'short']
+        # Typed arrays straight from the column store
+        rows = np.asarray(self._trade_rows, dtype=np.int64)
+        returns = self._trades.column('return_pct')[rows]
+        is_long = self._trades.column('position_type')[rows] > 0
 
         # Long position metrics
-        long_metrics = self._calculate_position_metrics(long_trades, 'long')
+        long_metrics = self._calculate_position_metrics(returns[is_long], 'long')
 
         # Short position metrics
-        short_metrics = self._calculate_position_metrics(short_trades, 'short')
+        short_metrics = self._calculate_position_metrics(returns[~is_long], 'short')
 
         return {
             'overall': {
-                'total_trades': len(self.trades)
+                'total_trades': self.trade_count
             },
             'long_positions': long_metrics,
             'short_positions': short_metrics,
             'combined': {
-                'hit_rate': self._calculate_overall_hit_rate(),
-                'average_return': self._calculate_overall_average_return()
+                'hit_rate': self._calculate_overall_hit_rate(returns),
+                'average_return': self._calculate_overall_average_return(returns)
             }
         }
 
-    def _calculate_position_metrics(self, trades: List[Dict], position_type: str) -> Dict:
+    def _calculate_position_metrics(self, returns: np.ndarray, position_type: str) -> Dict:
         """Calculate metrics for specific position type (long/short)"""
-        if not trades:
+        if len(returns) == 0:
             return {
                 'hit_rate': 0.0,
                 'average_return': 0.0,
@@ -159,48 +184,33 @@ class PerformanceMetrics:
                 'worst_trade': 0.0
             }
 
-        # Calculate returns for each trade
-        returns = [t['return_pct'] for t in trades]
-
         # Hit rate (percentage of profitable trades)
-        profitable_trades = sum(1 for r in returns if r > 0)
-        hit_rate = (profitable_trades / len(trades)) * 100
-
-        # Average return
-        average_return = np.mean(returns)
-
-        # Total return for this position type
-        total_return = sum(returns)
-
-        # Best and worst trades
-        best_trade = max(returns)
-        worst_trade = min(returns)
+        profitable_trades = int(np.count_nonzero(returns > 0))
+        hit_rate = (profitable_trades / len(returns)) * 100
 
         return {
             'hit_rate': hit_rate,
-            'average_return': average_return,
-            'total_trades': len(trades),
+            'average_return': float(returns.mean()),
+            'total_trades': len(returns),
             'profitable_trades': profitable_trades,
-            'total_return': total_return,
-            'best_trade': best_trade,
-            'worst_trade': worst_trade
+            'total_return': float(returns.sum()),
+            'best_trade': float(returns.max()),
+            'worst_trade': float(returns.min())
         }
 
-    def _calculate_overall_hit_rate(self) -> float:
+    def _calculate_overall_hit_rate(self, returns: np.ndarray) -> float:
         """Calculate overall hit rate across all trades"""
-        if not self.trades:
+        if len(returns) == 0:
             return 0.0
 
-        profitable_trades = sum(1 for t in self.trades if t['return_pct'] > 0)
-        return (profitable_trades / len(self.trades)) * 100
+        return (np.count_nonzero(returns > 0) / len(returns)) * 100
 
-    def _calculate_overall_average_return(self) -> float:
+    def _calculate_overall_average_return(self, returns: np.ndarray) -> float:
         """Calculate overall average return across all trades"""
-        if not self.trades:
+        if len(returns) == 0:
             return 0.0
 
-        returns = [t['return_pct'] for t in self.trades]
-        return np.mean(returns)
+        return float(returns.mean())
 
     def _empty_results(self) -> Dict:
         """Return empty results structure"""
@@ -2,9 +2,12 @@
 Portfolio management for the backtesting system
 """
 import pandas as pd
+import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from .position import Position, PositionType, PositionStatus, ExitReason
+from .position import (OpenPosition, ClosedPosition, ExitReason, EXIT_REASON_CODES,
+                       LONG, SHORT, PATTERN_EXIT)
+from .position_book import PositionBook
 from .config import BacktestConfig
 
 class Portfolio:
@@ -15,105 +18,158 @@ class Portfolio:
         self.config = config
         self.initial_capital = config.initial_capital
         self.cash = config.initial_capital
-        self.positions: Dict[str, Position] = {}  # symbol -> position
-        self.closed_positions: List[Position] = []
+
+        # Every position lives in one columnar book; Position objects are only
+        # built on demand (positions / closed_positions)
+        self.book = PositionBook()
+        self.open_rows: Dict[str, int] = {}  # symbol -> book row, in opening order
+        self.closed_rows: List[int] = []  # book rows of closed positions, in exit order
+        self.symbol_ids: Dict[str, int] = {}  # symbol -> id stored in the book
+
+        # Constant per-trade sizing and cost rates
+        self._position_value = config.initial_capital * config.position_size_pct
+        self._commission_rate = config.commission_bps / 10000
+
+    @property
+    def positions(self) -> Dict[str, OpenPosition]:
+        """Open positions (symbol -> position, in opening order), built from the book"""
+        return {symbol: self._materialize(row) for symbol, row in self.open_rows.items()}
+
+    @property
+    def closed_positions(self) -> List[ClosedPosition]:
+        """Closed positions in exit order, built from the book"""
+        return [self._materialize(row) for row in self.closed_rows]
+
+    def _materialize(self, row: int):
+        """Book row as a Position object"""
+        return self.book.position(row, self.config.stop_loss_pct, self.config.stop_win_pct)
 
     def has_position_in_stock(self, symbol: str) -> bool:
         """Check if we already have an open position in a specific stock"""
-        return symbol in self.positions
+        return symbol in self.open_rows
+
+    def position_type(self, symbol: str) -> int:
+        """Type of the open position in a stock: +1 long, -1 short, 0 if none"""
+        row = self.open_rows.get(symbol)
+        if row is None:
+            return 0
+        return int(self.book.column('position_type')[row])
 
     def open_long_position(self, symbol: str, entry_date: datetime,
                           entry_price: float, volume: float) -> bool:
         """Open a long position"""
-        # Check if we already have a position in this stock
-        if self.has_position_in_stock(symbol):
-            return False
-
-        # Calculate position size
-        position_value = self.initial_capital * self.config.position_size_pct
-        shares = position_value / entry_price
-
-        # Create position
-        position = Position(
-            symbol=symbol,
-            position_type=PositionType.LONG,
-            entry_date=entry_date,
-            entry_price=entry_price,
-            shares=shares,
-            entry_value=position_value,
-            stop_loss_pct=self.config.stop_loss_pct,
-            stop_win_pct=self.config.stop_win_pct
-        )
-
-        # Update portfolio
-        self.positions[symbol] = position
-
-        return True
+        return self._open_position(symbol, entry_date, entry_price, LONG)
 
     def open_short_position(self, symbol: str, entry_date: datetime,
                            entry_price: float, volume: float) -> bool:
         """Open a short position"""
+        return self._open_position(symbol, entry_date, entry_price, SHORT)
+
+    def _open_position(self, symbol: str, entry_date: datetime,
+                       entry_price: float, position_type: int) -> bool:
+        """Open a fixed-size position of the given type (+1 long, -1 short)"""
         # Check if we already have a position in this stock
-        if self.has_position_in_stock(symbol):
+        if symbol in self.open_rows:
             return False
 
-        # Calculate position size
-        position_value = self.initial_capital * self.config.position_size_pct
-        shares = position_value / entry_price
-
-        # Create position
-        position = Position(
-            symbol=symbol,
-            position_type=PositionType.SHORT,
-            entry_date=entry_date,
-            entry_price=entry_price,
-            shares=shares,
-            entry_value=position_value,
-            stop_loss_pct=self.config.stop_loss_pct,
-            stop_win_pct=self.config.stop_win_pct
+        # Size is a fixed fraction of initial capital
+        self.open_rows[symbol] = self.book.open_position(
+            symbol, position_type, int(np.datetime64(entry_date, 'D').view('int64')),
+            entry_price, self._position_value / entry_price, self._position_value,
+            self.config.stop_loss_pct, self.config.stop_win_pct,
+            self.symbol_ids.setdefault(symbol, len(self.symbol_ids))
         )
 
-        # Update portfolio
-        self.positions[symbol] = position
-
         return True
 
     def close_position(self, symbol: str, exit_date: datetime,
-                      exit_price: float, exit_reason: ExitReason):
-        """Close a position"""
-        if symbol not in self.positions:
-            return
+                      exit_price: float, exit_reason: ExitReason) -> Optional[int]:
+        """Close a position and return its book row (None if not held)"""
+        row = self.open_rows.pop(symbol, None)
+        if row is None:
+            return None
+
+        # Commission on the entry value; the book computes the P&L
+        commission = self.book.column('entry_value')[row] * self._commission_rate
+        self.book.close_position(
+            row, int(np.datetime64(exit_date, 'D').view('int64')),
+            exit_price, EXIT_REASON_CODES[exit_reason], commission
+        )
+        self.closed_rows.append(row)
 
-        position = self.positions[symbol]
+        return row
 
-        # Calculate commission
-        commission = (position.entry_value * self.config.commission_bps) / 10000
+    def export_rows(self) -> Tuple[Dict[str, np.ndarray], Dict[str, int], List[int]]:
+        """Filled book columns plus open and closed rows, for merge() into another portfolio"""
+        return self.book.take(np.arange(len(self.book))), dict(self.open_rows), list(self.closed_rows)
 
-        # Close position
-        position.close_position(exit_date, exit_price, exit_reason, commission)
+    def merge(self, parts: List[Tuple[Dict[str, np.ndarray], Dict[str, int], List[int]]]):
+        """
+        Append positions recorded by other portfolios (e.g. worker processes)
 
-        # Move to closed positions
-        self.closed_positions.append(position)
-        del self.positions[symbol]
+        Each part is an export_rows() result, in symbol order. Rows are added in
+        the chronological loop's opening order (entry day, then part order) and
+        closed rows in its exit order: a day's stop exits by opening order,
+        then its pattern exits by part order.
+        """
+        if not parts:
+            return
+
+        sizes = [len(columns['symbol']) for columns, _, _ in parts]
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        part_index = np.repeat(np.arange(len(parts)), sizes)
+        columns = {name: np.concatenate([part[0][name] for part in parts]) for name in parts[0][0]}
+
+        # Append every row in opening order; new_rows maps concatenated row -> book row
+        order = np.lexsort((part_index, columns['entry_date']))
+        columns = {name: values[order] for name, values in columns.items()}
+        columns['symbol_id'] = np.array(
+            [self.symbol_ids.setdefault(symbol, len(self.symbol_ids)) for symbol in columns['symbol']],
+            dtype=np.int32
+        )
+        new_rows = np.empty(len(order), dtype=np.int64)
+        new_rows[order] = self.book.extend(columns) + np.arange(len(order))
+
+        opened = sorted((int(new_rows[offsets[i] + row]), symbol)
+                        for i, (_, open_rows, _) in enumerate(parts) for symbol, row in open_rows.items())
+        self.open_rows.update((symbol, row) for row, symbol in opened)
+
+        closed = np.array([offsets[i] + row for i, (_, _, closed_rows) in enumerate(parts)
+                           for row in closed_rows], dtype=np.int64)
+        if len(closed):
+            closed_parts, closed = part_index[closed], new_rows[closed]
+            is_pattern = self.book.column('exit_reason')[closed] == PATTERN_EXIT
+            tiebreak = np.where(is_pattern, closed_parts, closed)
+            exit_order = np.lexsort((tiebreak, is_pattern, self.book.column('exit_date')[closed]))
+            self.closed_rows.extend(closed[exit_order].tolist())
+
+    def open_row_array(self) -> np.ndarray:
+        """Book rows of all open positions, in opening order"""
+        return np.fromiter(self.open_rows.values(), dtype=np.int64, count=len(self.open_rows))
+
+    def positions_dataframe(self) -> pd.DataFrame:
+        """All positions opened so far (open and closed) as one DataFrame, in opening order"""
+        return self.book.to_dataframe()
 
     def get_total_value(self, current_prices: Dict[str, float]) -> float:
         """Calculate total portfolio value including open positions"""
         total_value = 0
+        shares = self.book.column('shares')
+        entry_value = self.book.column('entry_value')
+        position_type = self.book.column('position_type')
 
-        for symbol, position in self.positions.items():
+        for symbol, row in self.open_rows.items():
             if symbol in current_prices:
                 current_price = current_prices[symbol]
-                if position.position_type == PositionType.LONG:
-                    total_value += position.shares * current_price
+                if position_type[row] == LONG:
+                    total_value += shares[row] * current_price
                 else:  # SHORT
-                    total_value += position.entry_value - (position.shares * current_price)
+                    total_value += entry_value[row] - (shares[row] * current_price)
 
         return total_value
 
     def get_open_positions_count(self) -> Tuple[int, int]:
         """Get count of open long and short positions"""
-        long_count = sum(1 for p in self.positions.values()
-                        if p.position_type == PositionType.LONG)
-        short_count = sum(1 for p in self.positions.values()
-                         if p.position_type == PositionType.SHORT)
-        return long_count, short_count
+        position_type = self.book.column('position_type')[self.open_row_array()]
+        long_count = int(np.count_nonzero(position_type == LONG))
+        return long_count, len(position_type) - long_count
@@ -3,7 +3,7 @@ Position tracking for individual stock positions
 """
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Literal
+from typing import Literal
 from enum import Enum
 
 class PositionType(Enum):
@@ -22,9 +22,15 @@ class ExitReason(Enum):
     STOP_LOSS = "stop_loss"
     STOP_WIN = "stop_win"
 
-@dataclass
-class Position:
-    """Individual stock position"""
+# Integer codes for hot paths and columnar stores (Enums stay at the to_dict boundary)
+LONG, SHORT = 1, -1
+PATTERN_EXIT, STOP_LOSS, STOP_WIN = 0, 1, 2
+EXIT_REASONS = tuple(ExitReason)  # exit reason code -> ExitReason
+EXIT_REASON_CODES = {reason: code for code, reason in enumerate(EXIT_REASONS)}
+
+@dataclass(slots=True)
+class OpenPosition:
+    """Open stock position: entry fields only (slotted: no per-instance __dict__)"""
 
     symbol: str
     position_type: PositionType
@@ -35,61 +41,92 @@ class Position:
     stop_loss_pct: float
     stop_win_pct: float
 
-    # Exit information (filled when position is closed)
-    exit_date: Optional[datetime] = None
-    exit_price: Optional[float] = None
-    exit_value: Optional[float] = None
-    return_pct: Optional[float] = None
-    return_amount: Optional[float] = None
-    hold_days: Optional[int] = None
-    exit_reason: Optional[ExitReason] = None
-    commission: Optional[float] = None
+    # Derived state (set in __post_init__)
+    ptype_i8: int = field(init=False, repr=False)  # +1 long, -1 short
+    stop_loss_price: float = field(init=False)   # trigger prices, fixed at entry
+    stop_win_price: float = field(init=False)
+    _entry_date_str: str = field(init=False, repr=False)  # ISO date cached for to_dict
+
+    status = PositionStatus.OPEN
 
     def __post_init__(self):
         """Calculate derived fields"""
-        self.status = PositionStatus.OPEN
+        self._entry_date_str = self.entry_date.date().isoformat()
 
-    def close_position(self, exit_date: datetime, exit_price: float,
-                      exit_reason: ExitReason, commission: float):
-        """Close the position and calculate returns"""
-        self.exit_date = exit_date
-        self.exit_price = exit_price
-        self.exit_value = self.shares * exit_price
-        self.commission = commission
-
-        # Calculate returns
+        # Stop trigger prices, fixed at entry
         if self.position_type == PositionType.LONG:
-            self.return_amount = self.exit_value - self.entry_value - commission
-            self.return_pct = (self.return_amount / self.entry_value) * 100
+            self.ptype_i8 = LONG
+            self.stop_loss_price = self.entry_price * (1 - self.stop_loss_pct)
+            self.stop_win_price = self.entry_price * (1 + self.stop_win_pct)
         else:  # SHORT
-            self.return_amount = self.entry_value - self.exit_value - commission
-            self.return_pct = (self.return_amount / self.entry_value) * 100
+            self.ptype_i8 = SHORT
+            self.stop_loss_price = self.entry_price * (1 + self.stop_loss_pct)
+            self.stop_win_price = self.entry_price * (1 - self.stop_win_pct)
 
-        # Calculate hold days
-        self.hold_days = (exit_date - self.entry_date).days
-        self.exit_reason = exit_reason
-        self.status = PositionStatus.CLOSED
+    def to_dict(self) -> dict:
+        """Convert position to dictionary for export (exit fields empty)"""
+        return {
+            'symbol': self.symbol,
+            'entry_date': self._entry_date_str,
+            'exit_date': None,
+            'position_type': self.position_type.value,
+            'entry_price': self.entry_price,
+            'exit_price': None,
+            'shares': self.shares,
+            'entry_value': self.entry_value,
+            'exit_value': None,
+            'return_pct': None,
+            'return_amount': None,
+            'hold_days': None,
+            'exit_reason': None,
+            'commission': None
+        }
 
-    def check_stop_loss(self, current_price: float) -> bool:
-        """Check if stop loss has been hit"""
-        if self.position_type == PositionType.LONG:
-            return current_price <= self.entry_price * (1 - self.stop_loss_pct)
-        else:  # SHORT
-            return current_price >= self.entry_price * (1 + self.stop_loss_pct)
+# Earlier name of the open-side position class
+Position = OpenPosition
 
-    def check_stop_win(self, current_price: float) -> bool:
-        """Check if stop win has been hit"""
-        if self.position_type == PositionType.LONG:
-            return current_price >= self.entry_price * (1 + self.stop_win_pct)
-        else:  # SHORT
-            return current_price <= self.entry_price * (1 - self.stop_win_pct)
+@dataclass(slots=True)
+class ClosedPosition:
+    """Closed stock position: entry plus exit fields (slotted: no per-instance __dict__)"""
+
+    symbol: str
+    position_type: PositionType
+    entry_date: datetime
+    entry_price: float
+    shares: float
+    entry_value: float
+    stop_loss_pct: float
+    stop_win_pct: float
+
+    # Exit information
+    exit_date: datetime
+    exit_price: float
+    exit_value: float
+    return_pct: float
+    return_amount: float
+    hold_days: int
+    exit_reason: ExitReason
+    commission: float
+
+    # Derived state (set in __post_init__)
+    ptype_i8: int = field(init=False, repr=False)  # +1 long, -1 short
+    _entry_date_str: str = field(init=False, repr=False)  # ISO dates cached for to_dict
+    _exit_date_str: str = field(init=False, repr=False)
+
+    status = PositionStatus.CLOSED
+
+    def __post_init__(self):
+        """Calculate derived fields"""
+        self.ptype_i8 = LONG if self.position_type == PositionType.LONG else SHORT
+        self._entry_date_str = self.entry_date.date().isoformat()
+        self._exit_date_str = self.exit_date.date().isoformat()
 
     def to_dict(self) -> dict:
         """Convert position to dictionary for export"""
         return {
             'symbol': self.symbol,
-            'entry_date': self.entry_date.strftime('%Y-%m-%d'),
-            'exit_date': self.exit_date.strftime('%Y-%m-%d') if self.exit_date else None,
+            'entry_date': self._entry_date_str,
+            'exit_date': self._exit_date_str,
             'position_type': self.position_type.value,
             'entry_price': self.entry_price,
             'exit_price': self.exit_price,
@@ -99,6 +136,6 @@ class Position:
             'return_pct': self.return_pct,
             'return_amount': self.return_amount,
             'hold_days': self.hold_days,
-            'exit_reason': self.exit_reason.value if self.exit_reason else None,
+            'exit_reason': self.exit_reason.value,
             'commission': self.commission
         }
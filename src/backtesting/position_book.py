@@ -0,0 +1,256 @@
+"""
+Columnar (structure-of-arrays) store for positions and completed trades
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from .position import (OpenPosition, ClosedPosition, PositionType, ExitReason, EXIT_REASONS)
+
+# Trade record layout (add_trade() tuple order) -> column dtype
+TRADE_COLUMNS = {
+    'symbol': object,
+    'entry_date': np.int32,      # day key (days since epoch)
+    'exit_date': np.int32,
+    'position_type': np.int8,    # +1 long, -1 short
+    'entry_price': np.float64,
+    'exit_price': np.float64,
+    'shares': np.float64,
+    'entry_value': np.float64,
+    'exit_value': np.float64,
+    'return_pct': np.float64,
+    'return_amount': np.float64,
+    'exit_reason': np.int8,      # ExitReason code (EXIT_REASON_CODES), -1 while open
+    'commission': np.float64
+}
+
+# Exported column order (matches Position.to_dict); hold_days is derived on export
+EXPORT_COLUMNS = ['symbol', 'entry_date', 'exit_date', 'position_type', 'entry_price',
+                  'exit_price', 'shares', 'entry_value', 'exit_value', 'return_pct',
+                  'return_amount', 'hold_days', 'exit_reason', 'commission']
+
+# Extra per-row state used while a position is open (not part of trade records)
+STATE_COLUMNS = {
+    'symbol_id': np.int32,       # caller-assigned integer id of the symbol
+    'sl_price': np.float64,      # stop loss trigger price, fixed at entry
+    'sw_price': np.float64       # stop win trigger price, fixed at entry
+}
+EXIT_REASON_VALUES = np.array([reason.value for reason in ExitReason])
+
+# Columns only meaningful once a position is closed (blanked for open rows on export)
+EXIT_FLOAT_COLUMNS = ('exit_price', 'exit_value', 'return_pct', 'return_amount', 'commission')
+
+def stop_fill_prices(position_type, is_stop_loss, stop_prices, opens):
+    """
+    Fill prices of stops hit intraday
+
+    A bar that opens beyond the stop gaps through it and fills at the open:
+    a long stop loss fills at min(open, stop), a long stop win at
+    max(open, stop), and shorts mirror both. Works on scalars or arrays.
+    """
+    # Flip the side for stop wins so both reduce to "fill at the lower signed price"
+    side = np.where(is_stop_loss, position_type, -position_type)
+    return side * np.minimum(side * opens, side * stop_prices)
+
+class PositionBook:
+    """Positions stored as parallel NumPy columns, one row per position"""
+
+    def __init__(self, capacity: int = 1024, columns: Optional[Dict[str, type]] = None):
+        """
+        Preallocate every column with the given row capacity
+
+        Args:
+            capacity: Initial row capacity (doubled when full)
+            columns: Column name -> dtype; TRADE_COLUMNS plus STATE_COLUMNS by
+                default. A TRADE_COLUMNS-only book holds completed trades
+                (add_trade) but cannot open positions.
+        """
+        if columns is None:
+            columns = {**TRADE_COLUMNS, **STATE_COLUMNS}
+        self._size = 0
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in columns.items()}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        """View of the filled rows of a column"""
+        return self._columns[name][:self._size]
+
+    def _reserve(self, count: int) -> int:
+        """Reserve count rows and return the first, doubling capacity until they fit"""
+        start = self._size
+        capacity = len(self._columns['symbol'])
+        if start + count > capacity:
+            while start + count > capacity:
+                capacity *= 2
+            for name, values in self._columns.items():
+                grown = np.empty(capacity, dtype=values.dtype)
+                grown[:start] = values[:start]
+                self._columns[name] = grown
+        self._size += count
+        return start
+
+    def _next_row(self) -> int:
+        """Reserve the next row"""
+        return self._reserve(1)
+
+    def open_position(self, symbol: str, position_type: int, entry_day: int,
+                      entry_price: float, shares: float, entry_value: float,
+                      stop_loss_pct: float = 0.0, stop_win_pct: float = 0.0,
+                      symbol_id: int = -1) -> int:
+        """Append an open position and return its row"""
+        row = self._next_row()
+        columns = self._columns
+        columns['symbol'][row] = symbol
+        columns['symbol_id'][row] = symbol_id
+        columns['sl_price'][row] = entry_price * (1 - position_type * stop_loss_pct)
+        columns['sw_price'][row] = entry_price * (1 + position_type * stop_win_pct)
+        columns['position_type'][row] = position_type
+        columns['entry_date'][row] = entry_day
+        columns['entry_price'][row] = entry_price
+        columns['shares'][row] = shares
+        columns['entry_value'][row] = entry_value
+        columns['exit_reason'][row] = -1
+        return row
+
+    def close_position(self, row: int, exit_day: int, exit_price: float,
+                       reason_code: int, commission: float):
+        """Write exit fields for a row; P&L sign comes from the position type"""
+        columns = self._columns
+        entry_value = columns['entry_value'][row]
+        exit_value = columns['shares'][row] * exit_price
+        return_amount = columns['position_type'][row] * (exit_value - entry_value) - commission
+
+        columns['exit_date'][row] = exit_day
+        columns['exit_price'][row] = exit_price
+        columns['exit_value'][row] = exit_value
+        columns['return_amount'][row] = return_amount
+        columns['return_pct'][row] = (return_amount / entry_value) * 100
+        columns['exit_reason'][row] = reason_code
+        columns['commission'][row] = commission
+
+    def check_stops(self, rows: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """
+        Check stops for many open rows at once
+
+        Args:
+            rows: Rows of the open positions to check
+            prices: Current price for each row (NaN if the stock did not trade)
+
+        Returns:
+            int8 array per row: 0 (none), 1 (stop loss) or 2 (stop win)
+        """
+        sign = self._columns['position_type'][rows]
+        signed_prices = sign * prices
+        hit_sl = signed_prices <= sign * self._columns['sl_price'][rows]
+        hit_sw = signed_prices >= sign * self._columns['sw_price'][rows]
+        return hit_sl.astype(np.int8) | (hit_sw.astype(np.int8) << 1)
+
+    def check_intraday_stops(self, rows: np.ndarray, opens: np.ndarray, highs: np.ndarray,
+                             lows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Check stops for many open rows against each bar's high/low range
+
+        Returns:
+            (int8 codes per row: 0 none, 1 stop loss, 2 stop win; fill prices,
+            see stop_fill_prices). Stop loss wins if a bar hits both.
+        """
+        sign = self._columns['position_type'][rows]
+        sl_price = self._columns['sl_price'][rows]
+        sw_price = self._columns['sw_price'][rows]
+        is_long = sign > 0
+        hit_sl = sign * np.where(is_long, lows, highs) <= sign * sl_price
+        hit_sw = sign * np.where(is_long, highs, lows) >= sign * sw_price
+        codes = np.where(hit_sl, 1, np.where(hit_sw, 2, 0)).astype(np.int8)
+        return codes, stop_fill_prices(sign, hit_sl, np.where(hit_sl, sl_price, sw_price), opens)
+
+    def add_trade(self, record: Tuple) -> int:
+        """Append a completed trade given as a tuple in TRADE_COLUMNS order"""
+        row = self._next_row()
+        for values, value in zip(self._columns.values(), record):
+            values[row] = value
+        return row
+
+    def take(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Copies of every column at the given rows"""
+        return {name: values[:self._size][rows] for name, values in self._columns.items()}
+
+    def extend(self, columns: Dict[str, np.ndarray]) -> int:
+        """Append rows given as column arrays (as from take()) and return the first new row"""
+        count = len(columns['symbol'])
+        start = self._reserve(count)
+        for name, values in columns.items():
+            self._columns[name][start:start + count] = values
+        return start
+
+    def position(self, row: int, stop_loss_pct: float = 0.0,
+                 stop_win_pct: float = 0.0) -> Union[OpenPosition, ClosedPosition]:
+        """
+        Materialize a row as an OpenPosition or ClosedPosition
+
+        For reporting only; the backtest itself works on the columns. Stop
+        percentages are not stored per row, so the caller supplies them.
+        """
+        columns = self._columns
+        entry_date = pd.Timestamp(int(columns['entry_date'][row]), unit='D')
+        fields = dict(
+            symbol=columns['symbol'][row],
+            position_type=PositionType.LONG if columns['position_type'][row] > 0 else PositionType.SHORT,
+            entry_date=entry_date,
+            entry_price=float(columns['entry_price'][row]),
+            shares=float(columns['shares'][row]),
+            entry_value=float(columns['entry_value'][row]),
+            stop_loss_pct=stop_loss_pct,
+            stop_win_pct=stop_win_pct
+        )
+        reason_code = int(columns['exit_reason'][row])
+        if reason_code < 0:
+            return OpenPosition(**fields)
+
+        exit_date = pd.Timestamp(int(columns['exit_date'][row]), unit='D')
+        return ClosedPosition(
+            **fields,
+            exit_date=exit_date,
+            exit_price=float(columns['exit_price'][row]),
+            exit_value=float(columns['exit_value'][row]),
+            return_pct=float(columns['return_pct'][row]),
+            return_amount=float(columns['return_amount'][row]),
+            hold_days=(exit_date - entry_date).days,
+            exit_reason=EXIT_REASONS[reason_code],
+            commission=float(columns['commission'][row])
+        )
+
+    def to_dataframe(self, rows: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """
+        Build a reporting DataFrame from the filled rows in one pass
+
+        Columns match Position.to_dict(); exit fields of still-open rows are
+        left empty (None/NaN).
+
+        Args:
+            rows: Rows to export, in output order (all filled rows if omitted)
+        """
+        if rows is None:
+            data = {name: self._columns[name][:self._size].copy() for name in TRADE_COLUMNS}
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            data = {name: self._columns[name][:self._size][rows] for name in TRADE_COLUMNS}
+        is_open = data['exit_reason'] < 0
+
+        # Hold time is one vector subtract over the epoch-day columns
+        data['hold_days'] = (data['exit_date'] - data['entry_date']).astype(np.int64)
+        data['entry_date'] = data['entry_date'].astype('datetime64[D]').astype(str)
+        data['exit_date'] = data['exit_date'].astype('datetime64[D]').astype(str)
+        data['position_type'] = np.where(data['position_type'] > 0, 'long', 'short')
+        data['exit_reason'] = EXIT_REASON_VALUES[data['exit_reason']]
+
+        if is_open.any():
+            for name in EXIT_FLOAT_COLUMNS:
+                data[name][is_open] = np.nan
+            for name in ('exit_date', 'exit_reason'):
+                data[name] = np.where(is_open, None, data[name])
+            data['hold_days'] = pd.array(np.where(is_open, 0, data['hold_days']), dtype='Int64')
+            data['hold_days'][is_open] = pd.NA
+
+        return pd.DataFrame(data, columns=EXPORT_COLUMNS)
@@ -2,10 +2,15 @@
 Trading signal interface for the backtesting system
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Tuple, Optional
 import pandas as pd
+import numpy as np
 from datetime import datetime
 
+from ..strategies.engulfing import EngulfingPattern
+
 class TradingSignal(ABC):
     """Abstract base class for trading signals"""
 
@@ -26,31 +31,98 @@ class TradingSignal(ABC):
 class EngulfingSignal(TradingSignal):
     """Engulfing pattern signal generator"""
 
+    # The detector is stateless, so every instance shares one
+    _detector: Optional[EngulfingPattern] = None
+
     def __init__(self):
-        from ..strategies.engulfing import EngulfingPattern
-        self.engulfing_detector = EngulfingPattern()
+        self.engulfing_detector = self.shared_detector()
+
+        # (frame, detect() result) keyed by a frame fingerprint (LRU, bounded);
+        # holding the frame keeps its id() from being reused while cached
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_size = 64
+
+    def __getstate__(self):
+        """Pickle without the cache (worker copies would only ship pinned frames)"""
+        state = self.__dict__.copy()
+        state['_cache'] = OrderedDict()
+        return state
+
+    @classmethod
+    def shared_detector(cls) -> EngulfingPattern:
+        """Return the EngulfingPattern shared by all instances (created on first use)"""
+        if cls._detector is None:
+            cls._detector = EngulfingPattern()
+        return cls._detector
+
+    def _detect_cached(self, stock_data: pd.DataFrame) -> np.ndarray:
+        """Run pattern detection once per frame object (callers reusing loaded frames, e.g. sweeps)"""
+        last_date = stock_data['date'].iat[-1] if len(stock_data) else None
+        key = (id(stock_data), len(stock_data), last_date)
+
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] is stock_data:
+            self._cache.move_to_end(key)
+            return cached[1]
+
+        patterns = self.engulfing_detector.detect(stock_data).to_numpy()
+        self._cache[key] = (stock_data, patterns)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return patterns
 
     def generate_signals(self, stock_data: pd.DataFrame) -> pd.DataFrame:
         """Generate engulfing pattern signals"""
         # Use the detect method to get all patterns at once
-        patterns = self.engulfing_detector.detect(stock_data)
-        signals = []
-
-        # Process the patterns series
-        for i in range(len(patterns)):
-            if patterns.iloc[i] == 1:  # Bullish engulfing
-                signals.append({
-                    'date': stock_data.iloc[i]['date'],
-                    'signal_type': 'bullish',
-                    'price': stock_data.iloc[i]['close'],
-                    'volume': stock_data.iloc[i]['volume']
-                })
-            elif patterns.iloc[i] == -1:  # Bearish engulfing
-                signals.append({
-                    'date': stock_data.iloc[i]['date'],
-                    'signal_type': 'bearish',
-                    'price': stock_data.iloc[i]['close'],
-                    'volume': stock_data.iloc[i]['volume']
-                })
-
-        return pd.DataFrame(signals) if signals else pd.DataFrame(columns=['date', 'signal_type', 'price', 'volume'])
+        return _signals_from_patterns(stock_data, self._detect_cached(stock_data))
+
+def engulfing_signals(stock_data: pd.DataFrame, detector=None) -> pd.DataFrame:
+    """
+    Generate engulfing pattern signals for one stock without class dispatch
+
+    Plain module-level function, so process pools can pickle it cheaply.
+
+    Args:
+        stock_data: DataFrame with columns ['date', 'open', 'high', 'low', 'close', 'volume']
+        detector: EngulfingPattern instance to use (the shared one if omitted)
+
+    Returns:
+        DataFrame with columns ['date', 'signal_type', 'price', 'volume']
+    """
+    if detector is None:
+        detector = EngulfingSignal.shared_detector()
+    return _signals_from_patterns(stock_data, detector.detect(stock_data).to_numpy())
+
+def generate_signals_multi(stock_frames: Dict[str, pd.DataFrame],
+                           signal_fn: Callable[[pd.DataFrame], pd.DataFrame] = engulfing_signals,
+                           max_workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Generate signals for many stocks in parallel worker processes
+
+    Each stock's signals are independent, so per-symbol work is spread over
+    a process pool.
+
+    Args:
+        stock_frames: symbol -> OHLCV DataFrame
+        signal_fn: Picklable per-stock signal function
+        max_workers: Worker processes (None = all cores)
+
+    Returns:
+        symbol -> signals DataFrame, in the order of stock_frames
+    """
+    symbols = list(stock_frames)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        all_signals = executor.map(signal_fn, [stock_frames[symbol] for symbol in symbols])
+        return dict(zip(symbols, all_signals))
+
+def _signals_from_patterns(stock_data: pd.DataFrame, patterns: np.ndarray) -> pd.DataFrame:
+    """Build the signal frame from per-bar pattern codes (1 bullish, -1 bearish, 0 none)"""
+    # Select the pattern rows positionally and build each column as one array
+    # (an empty selection still yields correctly typed columns)
+    idx = np.flatnonzero(patterns != 0)
+    return pd.DataFrame({
+        'date': stock_data['date'].to_numpy()[idx],
+        'signal_type': np.where(patterns[idx] == 1, 'bullish', 'bearish'),
+        'price': stock_data['close'].to_numpy()[idx],
+        'volume': stock_data['volume'].to_numpy()[idx]
+    })
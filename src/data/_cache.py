@@ -0,0 +1,48 @@
+"""
+On-disk cache for downloaded data, keyed by (endpoint, symbol, date range)
+"""
+import os
+import time
+import hashlib
+import threading
+from typing import Optional
+
+
+class FileCache:
+    """Stores raw payloads under {root}/{endpoint}/{symbol}_{hash}{suffix} with a TTL"""
+
+    def __init__(self, root: str = ".cache", ttl_days: float = 1, suffix: str = ".parquet"):
+        self.root = root
+        self.ttl_seconds = ttl_days * 86400
+        self.suffix = suffix
+
+    @staticmethod
+    def make_key(endpoint: str, symbol: str, start: Optional[str] = None,
+                 end: Optional[str] = None, *params: str) -> str:
+        """Cache key for one request: {endpoint}/{symbol}_{md5 of the request}"""
+        request = "|".join([endpoint, symbol, str(start), str(end), *params])
+        digest = hashlib.md5(request.encode()).hexdigest()
+        return f"{endpoint}/{symbol}_{digest}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached payload, or None if missing or older than the TTL"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key: str, data: bytes):
+        """Store a payload; written to a temp file first so readers never see a partial file"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
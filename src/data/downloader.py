@@ -1,18 +1,175 @@
 """
 Financial data downloader for multiple sources (Polygon.io)
 """
+import io
 import os
+import json
 import time
+import random
+import functools
+import operator
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Tuple, Any, Iterable
 from dotenv import load_dotenv
 
+from ._cache import FileCache
+
+# Corporate events DataFrame column -> TMX event attribute
+_CORPORATE_EVENT_FIELDS = {
+    'date': 'date',
+    'ticker': 'ticker',
+    'company_name': 'company_name',
+    'event_type': 'type',
+    'event_name': 'name',
+    'status': 'status',
+    'trading_venue': 'trading_venue',
+    'isin': 'isin',
+    'tmx_company_id': 'tmx_company_id',
+    'tmx_record_id': 'tmx_record_id',
+    'url': 'url'
+}
+
+# Fundamentals DataFrame columns (same names as the client's financials attributes)
+_FUNDAMENTAL_FIELDS = [
+    'ticker', 'period_of_report_date', 'filing_date', 'source_filing_file_url',
+    'source_filing_url', 'period_length', 'period_end_date', 'fiscal_period', 'fiscal_year',
+    'cik', 'company_name', 'sic_code', 'sic_description', 'naics_code', 'naics_description',
+    'filing_url', 'filing_title', 'filing_date_str', 'period_of_report_date_str',
+    'period_end_date_str', 'filing_href', 'financials'
+]
+
+# Fundamentals columns without the nested financials blob and duplicated string/link fields
+FUNDAMENTAL_METADATA_FIELDS = [
+    field for field in _FUNDAMENTAL_FIELDS
+    if field != 'financials' and field != 'filing_href' and not field.endswith('_str')
+]
+
+# Attributes kept per ticker by get_polygon_tickers_all
+_TICKER_FIELDS = ['ticker', 'name', 'market', 'locale', 'primary_exchange', 'type', 'active',
+                  'currency_name', 'cik', 'composite_figi', 'share_class_figi', 'last_updated_utc']
+
+# Low-cardinality string columns, stored as pandas categoricals / Arrow dictionaries
+_CORPORATE_EVENT_CATEGORIES = ['ticker', 'event_type', 'status', 'trading_venue']
+_FUNDAMENTAL_CATEGORIES = ['ticker', 'fiscal_period', 'sic_code', 'sic_description']
+
+# Schema of the combined corporate events Parquet file (one row group per symbol)
+_CORPORATE_EVENT_TYPES = {
+    'date': pa.timestamp('ns'),
+    'tmx_company_id': pa.int64(),
+    'symbol': pa.dictionary(pa.int32(), pa.string()),
+    **{column: pa.dictionary(pa.int32(), pa.string()) for column in _CORPORATE_EVENT_CATEGORIES}
+}
+_CORPORATE_EVENT_SCHEMA = pa.schema([
+    (column, _CORPORATE_EVENT_TYPES.get(column, pa.string()))
+    for column in [*_CORPORATE_EVENT_FIELDS, 'symbol']
+])
+
+# orjson is optional; stdlib json parses the same bytes, just more slowly
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 # Load environment variables
 load_dotenv()
 
+# Stored OHLCV schema: float32 prices, int64 volume rounded to whole shares (dates are
+# written as timestamps)
+_OHLCV_DTYPES = {'open': 'float32', 'high': 'float32', 'low': 'float32', 'close': 'float32',
+                'volume': 'int64'}
+
 
+def _attribute_rows(objects: List[Any], attributes: List[str],
+                    defaults: Optional[Dict[str, Any]] = None) -> List[Tuple]:
+    """
+    Read the given attributes of each client object into a row tuple
+
+    A precompiled attrgetter reads all attributes in one C call; objects missing
+    an attribute fall back to per-attribute getattr with defaults (else None).
+    """
+    defaults = defaults or {}
+    getter = operator.attrgetter(*attributes)
+    rows = []
+    for obj in objects:
+        try:
+            row = getter(obj)
+            rows.append(row if len(attributes) > 1 else (row,))
+        except AttributeError:
+            rows.append(tuple(getattr(obj, name, defaults.get(name)) for name in attributes))
+    return rows
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing at most max_rate calls per time_period seconds"""
+
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = max_rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._last) * self.max_rate / self.time_period
+                self._tokens = min(self.max_rate, self._tokens + refill)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.time_period / self.max_rate
+            # Sleep without the lock so rate feedback from other workers applies at once
+            time.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def on_success(self):
+        """Feedback hook for a successful request (no-op for a fixed rate)"""
+
+    def on_throttle(self):
+        """Feedback hook for a 429/5xx response (no-op for a fixed rate)"""
+
+
+class AIMDRateLimiter(RateLimiter):
+    """
+    Token bucket whose rate adapts to the API: additive increase on success,
+    multiplicative decrease on throttling, bounded by [min_rate, max_rate]
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 1.0, min_rate: float = 1.0,
+                 increase: float = 0.5, decrease: float = 0.5):
+        super().__init__(max_rate, time_period)
+        self.ceiling = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.increase = increase
+        self.decrease = decrease
+
+    def on_success(self):
+        with self._lock:
+            self.max_rate = min(self.ceiling, self.max_rate + self.increase)
+
+    def on_throttle(self):
+        with self._lock:
+            self.max_rate = max(self.min_rate, self.max_rate * self.decrease)
+            self._tokens = min(self._tokens, self.max_rate)
 
 
 class DataDownloader:
@@ -26,6 +183,27 @@ class DataDownloader:
 
         self.polygon_base_url = "https://api.polygon.io"
         self.polygon_rate_limit = 0.1  # 100ms between requests
+        # Shared across threads; backs off when Polygon throttles and recovers as requests succeed
+        self._limiter = AIMDRateLimiter(max_rate=1 / self.polygon_rate_limit)
+        self.max_concurrent_downloads = 8  # parallel HTTP requests for multi-symbol downloads
+
+        # Pooled keep-alive session for all HTTP calls; the adapter retries connection
+        # failures, _get retries 429s and server errors
+        retry = Retry(total=3, backoff_factor=0.5)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        # Advertise every codec urllib3 can decode (gzip/deflate, plus br/zstd when installed)
+        self._session.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+        self.max_retries = 5  # retries per request on HTTP 429/5xx
+        self.request_timeout = (3, 30)  # (connect, read) seconds, so a stalled socket can't hang a worker
+
+        # On-disk response caches (prices refresh daily, fundamentals change rarely)
+        self.cache_dir = ".cache"
+        self._ohlcv_cache = FileCache(self.cache_dir, ttl_days=1)
+        self._events_cache = FileCache(self.cache_dir, ttl_days=1)
+        self._fundamentals_cache = FileCache(self.cache_dir, ttl_days=30)
+        self._universe_cache = FileCache(self.cache_dir, ttl_days=1, suffix=".json")
 
         # Corporate events output directory
         self.corporate_events_output_dir = "data/corporate_events"
@@ -33,23 +211,88 @@ class DataDownloader:
 
         # Stock universe setup
         self.universe_rate_limit = 0.5  # 500ms between requests
+        self._ticker_symbols: Dict[Tuple[str, bool], Tuple[str, ...]] = {}  # (market, active) -> symbols
+
+    def _get(self, url: str, limiter: Optional[RateLimiter] = None, **kwargs) -> requests.Response:
+        """
+        GET through the pooled session, retrying rate-limited and server-error responses
+
+        A 429 waits as long as its Retry-After header asks; other retries back off
+        exponentially (capped at 60s) with jitter. Each response is reported to the
+        limiter so an adaptive one can slow down or speed up. The final response is
+        returned as-is for the caller's raise_for_status().
+        """
+        kwargs.setdefault('timeout', self.request_timeout)
+        for attempt in range(self.max_retries + 1):
+            if limiter is not None:
+                limiter.acquire()
+            response = self._session.get(url, **kwargs)
+            status = response.status_code
+            if limiter is not None:
+                if status == 429 or status >= 500:
+                    limiter.on_throttle()
+                else:
+                    limiter.on_success()
+            if (status != 429 and status < 500) or attempt == self.max_retries:
+                return response
+
+            delay = min(60, 2 ** attempt) + random.random()
+            if status == 429:
+                try:
+                    delay = float(response.headers['Retry-After'])
+                except (KeyError, ValueError):
+                    pass
+            print(f"HTTP {status} from {url}, retrying in {delay:.1f}s "
+                  f"({attempt + 1}/{self.max_retries})...")
+            time.sleep(delay)
+
+    @functools.cached_property
+    def _polygon_client(self):
+        """Official Polygon.io REST client, imported and built once per downloader"""
+        try:
+            from polygon import RESTClient
+        except ImportError:
+            print("Error: 'polygon' package not installed. Please install it with: pip install polygon-api-client")
+            return None
+        return RESTClient(self.polygon_api_key, connect_timeout=5, read_timeout=30)
 
     def _ensure_corporate_events_directory(self):
         """Create corporate events output directory if it doesn't exist"""
         os.makedirs(self.corporate_events_output_dir, exist_ok=True)
 
+    def _read_cached(self, cache: FileCache, key: str) -> Optional[pd.DataFrame]:
+        """Load a cached DataFrame, or None on a miss"""
+        data = cache.get(key)
+        if data is None:
+            return None
+        try:
+            return pd.read_parquet(io.BytesIO(data))
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable cache entry {key}: {e}")
+            return None
+
+    def _write_cached(self, cache: FileCache, key: str, df: pd.DataFrame):
+        """Store a DataFrame in the cache; failures only cost a refetch next time"""
+        try:
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, index=False)
+            cache.set(key, buffer.getvalue())
+        except Exception as e:
+            print(f"Warning: Could not cache {key}: {e}")
+
     # Stock Universe Methods
-    def _scrape_wikipedia_table(self, url: str, table_index: int = 0) -> List[str]:
-        """Scrape symbols from a Wikipedia table"""
+    def _scrape_wikipedia_table(self, url: str, table_index: int = 0,
+                                attrs: Optional[Dict[str, str]] = None) -> List[str]:
+        """Scrape symbols from a Wikipedia table (attrs narrows parsing to matching tables)"""
         try:
             print(f"Scraping from: {url}")
 
             # Get the Wikipedia page
-            response = requests.get(url)
+            response = self._get(url)
             response.raise_for_status()
 
-            # Parse HTML tables
-            tables = pd.read_html(response.text)
+            # Parse HTML tables with the C-backed lxml parser, only those matching attrs
+            tables = pd.read_html(io.StringIO(response.text), flavor="lxml", attrs=attrs, header=0)
 
             if not tables or table_index >= len(tables):
                 print(f"No tables found or table index {table_index} out of range")
@@ -69,32 +312,28 @@ class DataDownloader:
                     break
 
             if symbol_col is None:
-                # Try to find column containing symbols
-                for col in table.columns:
-                    if table[col].dtype == 'object':
-                        # Check if first few values look like stock symbols
-                        sample_values = table[col].dropna().head(10).astype(str)
-                        if all(len(str(val)) <= 5 and str(val).isupper() for val in sample_values):
-                            symbol_col = col
-                            break
+                # Try to find column containing symbols: the first text column whose
+                # leading values are mostly (>90%) ticker-shaped
+                for col in table.select_dtypes(include=['object', 'string']).columns:
+                    sample_values = table[col].dropna().head(50).astype(str)
+                    score = sample_values.str.fullmatch(r"[A-Z0-9.]{1,5}").mean()
+                    if score > 0.9:
+                        symbol_col = col
+                        break
 
             if symbol_col is None:
                 print(f"Could not identify symbol column. Available columns: {table.columns.tolist()}")
                 print(f"First few rows of first column: {table.iloc[:5, 0].tolist()}")
                 return []
 
-            # Extract symbols
-            symbols = table[symbol_col].dropna().astype(str).tolist()
-
-            # Clean symbols (remove any non-alphanumeric characters except dots)
-            cleaned_symbols = []
-            for symbol in symbols:
-                cleaned = ''.join(c for c in symbol if c.isalnum() or c == '.')
-                if cleaned and len(cleaned) <= 5:  # Most stock symbols are 1-5 characters
-                    cleaned_symbols.append(cleaned)
+            # Extract symbols and clean them in one vectorized pass
+            # (remove any non-alphanumeric characters except dots)
+            symbols = table[symbol_col].dropna().astype(str)
+            cleaned = symbols.str.replace(r"[^A-Za-z0-9.]", "", regex=True)
+            cleaned = cleaned[cleaned.str.len().between(1, 5)]  # Most stock symbols are 1-5 characters
 
             # Remove duplicates and sort
-            unique_symbols = sorted(list(set(cleaned_symbols)))
+            unique_symbols = sorted(cleaned.unique().tolist())
 
             print(f"Extracted {len(unique_symbols)} unique symbols from {symbol_col} column")
             print(f"Sample symbols: {unique_symbols[:10]}")
@@ -105,13 +344,30 @@ class DataDownloader:
             print(f"Error scraping Wikipedia: {e}")
             return []
 
-    def get_sp500_symbols(self) -> List[str]:
-        """Get S&P 500 symbols from Wikipedia"""
+    def get_sp500_symbols(self, force_refresh: bool = False) -> List[str]:
+        """
+        Get S&P 500 symbols from Wikipedia
+
+        Args:
+            force_refresh: Scrape the page even if a cached list is still fresh
+        """
+        # A scraped list is reused for a day before the page is fetched again
+        cache_key = FileCache.make_key('universe', 'sp500')
+        cached = None if force_refresh else self._universe_cache.get(cache_key)
+        if cached is not None:
+            symbols = json_loads(cached)
+            print(f"✓ Loaded {len(symbols)} cached S&P 500 symbols")
+            return symbols
+
         url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-        symbols = self._scrape_wikipedia_table(url)
+        symbols = self._scrape_wikipedia_table(url, attrs={"id": "constituents"})
 
         if len(symbols) >= 400:  # Should be around 500
             print(f"✓ Successfully scraped {len(symbols)} S&P 500 symbols from Wikipedia")
+            try:
+                self._universe_cache.set(cache_key, json.dumps(symbols).encode())
+            except OSError as e:
+                print(f"Warning: Could not cache S&P 500 symbols: {e}")
             return symbols
         else:
             print(f"⚠️ Only got {len(symbols)} symbols, using fallback list")
@@ -142,6 +398,12 @@ class DataDownloader:
             print(f"Error: POLYGON_API_KEY not set. Cannot download OHLCV data for {symbol}")
             return None
 
+        cache_key = FileCache.make_key('ohlcv', symbol, start_date, end_date)
+        df = self._read_cached(self._ohlcv_cache, cache_key)
+        if df is not None:
+            print(f"✓ Loaded {len(df)} cached daily OHLCV records for {symbol}")
+            return df
+
         try:
             url = f"{self.polygon_base_url}/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}"
             params = {
@@ -150,25 +412,32 @@ class DataDownloader:
                 'sort': 'asc'
             }
 
-            response = requests.get(url, params=params)
+            response = self._get(url, limiter=self._limiter, params=params)
             response.raise_for_status()
 
-            data = response.json()
+            data = json_loads(response.content)
 
             if data['status'] != 'OK' or not data['results']:
                 print(f"No data found for {symbol}")
                 return None
 
-            # Convert to DataFrame
-            df = pd.DataFrame(data['results'])
-            df['date'] = pd.to_datetime(df['t'], unit='ms').dt.date
-            df = df[['date', 'o', 'h', 'l', 'c', 'v']]
-            df.columns = ['date', 'open', 'high', 'low', 'close', 'volume']
+            # Convert to DataFrame: one pass over the bars fills typed column arrays
+            results = data['results']
+            n = len(results)
+            timestamps = np.empty(n, dtype='int64')
+            columns = {name: np.empty(n, dtype=dtype) for name, dtype in _OHLCV_DTYPES.items()}
+            opens, highs, lows, closes, volumes = columns.values()
+            for i, bar in enumerate(results):
+                timestamps[i] = bar['t']
+                opens[i] = bar['o']
+                highs[i] = bar['h']
+                lows[i] = bar['l']
+                closes[i] = bar['c']
+                volumes[i] = round(bar['v'])  # adjusted aggregates have fractional volume
+            df = pd.DataFrame({'date': pd.to_datetime(timestamps, unit='ms').date, **columns})
 
             print(f"✓ Downloaded {len(df)} daily OHLCV records for {symbol}")
-
-            # Rate limiting
-            time.sleep(self.polygon_rate_limit)
+            self._write_cached(self._ohlcv_cache, cache_key, df)
 
             return df
 
@@ -193,31 +462,168 @@ class DataDownloader:
         """
         results = {}
 
-        for symbol in symbols:
+        def download(symbol: str) -> Optional[pd.DataFrame]:
             print(f"Downloading OHLCV data for {symbol}...")
-            data = self.download_ohlcv_data(symbol, start_date, end_date)
-            if data is not None:
-                results[symbol] = data
-                print(f"Successfully downloaded {len(data)} days of OHLCV data for {symbol}")
-            else:
-                print(f"Failed to download OHLCV data for {symbol}")
+            return self.download_ohlcv_data(symbol, start_date, end_date)
+
+        # Requests are network-bound, so overlap them on a bounded thread pool
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_downloads) as executor:
+            for symbol, data in zip(symbols, executor.map(download, symbols)):
+                if data is not None:
+                    results[symbol] = data
+                    print(f"Successfully downloaded {len(data)} days of OHLCV data for {symbol}")
+                else:
+                    print(f"Failed to download OHLCV data for {symbol}")
 
         return results
 
-    def save_ohlcv_data(self, data_dict: dict, output_dir: str = "data/raw"):
+    def _download_grouped_day(self, date: str) -> Optional[pd.DataFrame]:
+        """Daily bars of every US stock for one date (None on a market holiday or failure)"""
+        cache_key = FileCache.make_key('grouped_daily', 'us_stocks', date)
+        df = self._read_cached(self._ohlcv_cache, cache_key)
+        if df is not None:
+            return df
+
+        try:
+            url = f"{self.polygon_base_url}/v2/aggs/grouped/locale/us/market/stocks/{date}"
+            params = {
+                'apiKey': self.polygon_api_key,
+                'adjusted': 'true'
+            }
+
+            response = self._get(url, limiter=self._limiter, params=params)
+            response.raise_for_status()
+
+            data = json_loads(response.content)
+            results = data.get('results')
+            if not results:
+                return None
+
+            # Same typed column fill as download_ohlcv_data, plus the ticker of each bar
+            n = len(results)
+            symbols = np.empty(n, dtype=object)
+            columns = {name: np.empty(n, dtype=dtype) for name, dtype in _OHLCV_DTYPES.items()}
+            opens, highs, lows, closes, volumes = columns.values()
+            for i, bar in enumerate(results):
+                symbols[i] = bar['T']
+                opens[i] = bar['o']
+                highs[i] = bar['h']
+                lows[i] = bar['l']
+                closes[i] = bar['c']
+                volumes[i] = round(bar['v'])
+            df = pd.DataFrame({'symbol': symbols, 'date': pd.Timestamp(date).date(), **columns})
+
+            self._write_cached(self._ohlcv_cache, cache_key, df)
+            return df
+
+        except requests.exceptions.RequestException as e:
+            print(f"Request error downloading grouped daily bars for {date}: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error downloading grouped daily bars for {date}: {e}")
+            return None
+
+    def download_grouped_daily(self, start_date: str, end_date: str,
+                               symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Download daily OHLCV data for all US stocks with one request per trading day
+
+        Uses Polygon's grouped daily endpoint, so a date range costs one request per
+        weekday instead of one per symbol.
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            symbols: Optional tickers to keep (all stocks if None)
+
+        Returns:
+            DataFrame with columns: symbol, date, open, high, low, close, volume,
+            sorted by symbol and date
+        """
+        columns = ['symbol', 'date', *_OHLCV_DTYPES]
+        if not self.polygon_api_key:
+            print("Error: POLYGON_API_KEY not set. Cannot download grouped daily bars")
+            return pd.DataFrame(columns=columns)
+
+        dates = [day.strftime('%Y-%m-%d') for day in pd.bdate_range(start_date, end_date)]
+        print(f"Downloading grouped daily bars for {len(dates)} weekdays...")
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_downloads) as executor:
+            frames = [df for df in executor.map(self._download_grouped_day, dates) if df is not None]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.concat(frames, ignore_index=True)
+        if symbols is not None:
+            df = df[df['symbol'].isin(list(symbols))]
+        df = df.sort_values(['symbol', 'date'], kind='stable').reset_index(drop=True)
+
+        print(f"✓ Downloaded {len(df)} daily OHLCV records for {df['symbol'].nunique()} symbols")
+        return df
+
+    def save_ohlcv_data(self, data_dict: dict, output_dir: str = "data/raw", format: str = "parquet"):
         """
-        Save downloaded OHLCV data to CSV files
+        Save downloaded OHLCV data to zstd-compressed Parquet (or CSV) files
 
         Args:
             data_dict: Dictionary of DataFrames from download_multiple_ohlcv
-            output_dir: Directory to save CSV files
+            output_dir: Directory to save files
+            format: 'parquet' (default) or 'csv' for the legacy layout
         """
+        if format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported format: {format!r} (expected 'parquet' or 'csv')")
         os.makedirs(output_dir, exist_ok=True)
 
         for symbol, df in data_dict.items():
-            filename = f"{output_dir}/{symbol}_daily.csv"
+            self._save_ohlcv_frame(symbol, df, output_dir, format)
+
+    def _save_ohlcv_frame(self, symbol: str, df: pd.DataFrame, output_dir: str, format: str) -> str:
+        """Write one symbol's OHLCV frame to {output_dir}/{symbol}_daily.{format}"""
+        filename = f"{output_dir}/{symbol}_daily.{format}"
+        df = df.astype(_OHLCV_DTYPES)
+        df['date'] = pd.to_datetime(df['date'])
+        if format == 'parquet':
+            df.to_parquet(filename, engine='pyarrow', compression='zstd', index=False)
+        else:
             df.to_csv(filename, index=False)
-            print(f"Saved {symbol} OHLCV data to {filename}")
+        print(f"Saved {symbol} OHLCV data to {filename}")
+        return filename
+
+    def download_and_save_ohlcv(self, symbols: List[str], start_date: str, end_date: str,
+                                output_dir: str = "data/raw", format: str = "parquet") -> List[str]:
+        """
+        Download OHLCV data for multiple stocks, saving each one as soon as it arrives
+
+        Unlike download_multiple_ohlcv + save_ohlcv_data, frames are written and
+        released as downloads complete, so memory holds only the in-flight symbols.
+
+        Args:
+            symbols: List of stock tickers
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            output_dir: Directory to save files
+            format: 'parquet' (default) or 'csv' for the legacy layout
+
+        Returns:
+            Paths of the saved files, in completion order
+        """
+        if format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported format: {format!r} (expected 'parquet' or 'csv')")
+        os.makedirs(output_dir, exist_ok=True)
+
+        saved = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_downloads) as executor:
+            futures = {executor.submit(self.download_ohlcv_data, symbol, start_date, end_date): symbol
+                       for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures.pop(future)
+                data = future.result()
+                if data is None:
+                    print(f"Failed to download OHLCV data for {symbol}")
+                    continue
+                saved.append(self._save_ohlcv_frame(symbol, data, output_dir, format))
+
+        return saved
 
     # Corporate Events Methods (from Polygon.io TMX)
     def download_corporate_events(self, symbol: str) -> Optional[pd.DataFrame]:
@@ -234,46 +640,34 @@ class DataDownloader:
             print(f"Error: POLYGON_API_KEY not set. Cannot download corporate events for {symbol}")
             return None
 
+        cache_key = FileCache.make_key('corporate_events', symbol)
+        df = self._read_cached(self._events_cache, cache_key)
+        if df is not None:
+            print(f"✓ Loaded {len(df)} cached corporate events for {symbol}")
+            return df
+
         try:
             print(f"Downloading corporate events for {symbol}...")
 
-            # Import the official Polygon.io client
-            try:
-                from polygon import RESTClient
-            except ImportError:
-                print("Error: 'polygon' package not installed. Please install it with: pip install polygon-api-client")
+            # Shared official Polygon.io client (None if the package is missing)
+            client = self._polygon_client
+            if client is None:
                 return None
 
-            # Initialize the REST client
-            client = RESTClient(self.polygon_api_key)
-
-            # Use the official client to get corporate events
+            # Use the official client to get corporate events (one attribute tuple per event)
             corporate_events = []
 
             try:
                 # Get corporate events using the official client
-                events = client.list_tmx_corporate_events(
-                    ticker=symbol,
-                    limit=50000
-                )
+                with self._limiter:
+                    events = list(client.list_tmx_corporate_events(
+                        ticker=symbol,
+                        limit=50000
+                    ))
 
                 # Process corporate events data
-                for event in events:
-                    event_entry = {
-                        'date': getattr(event, 'date', None),
-                        'ticker': getattr(event, 'ticker', symbol),
-                        'company_name': getattr(event, 'company_name', None),
-                        'event_type': getattr(event, 'type', None),
-                        'event_name': getattr(event, 'name', None),
-                        'status': getattr(event, 'status', None),
-                        'trading_venue': getattr(event, 'trading_venue', None),
-                        'isin': getattr(event, 'isin', None),
-                        'tmx_company_id': getattr(event, 'tmx_company_id', None),
-                        'tmx_record_id': getattr(event, 'tmx_record_id', None),
-                        'url': getattr(event, 'url', None)
-                    }
-
-                    corporate_events.append(event_entry)
+                corporate_events = _attribute_rows(events, list(_CORPORATE_EVENT_FIELDS.values()),
+                                                   {'ticker': symbol})
 
             except Exception as e:
                 print(f"Error retrieving corporate events from client: {e}")
@@ -281,17 +675,16 @@ class DataDownloader:
 
             # Convert to DataFrame and sort by date (most recent first)
             if corporate_events:
-                df = pd.DataFrame(corporate_events)
+                df = pd.DataFrame(corporate_events, columns=list(_CORPORATE_EVENT_FIELDS))
                 df['date'] = pd.to_datetime(df['date'])
+                df[_CORPORATE_EVENT_CATEGORIES] = df[_CORPORATE_EVENT_CATEGORIES].astype('category')
                 df = df.sort_values('date', ascending=False)
                 print(f"✓ Downloaded {len(df)} corporate events for {symbol}")
             else:
                 df = pd.DataFrame()
                 print(f"✓ No corporate events found for {symbol}")
 
-            # Rate limiting
-            time.sleep(self.polygon_rate_limit)
-
+            self._write_cached(self._events_cache, cache_key, df)
             return df
 
         except Exception as e:
@@ -308,38 +701,49 @@ class DataDownloader:
         Returns:
             DataFrame with corporate events data and a symbols column
         """
-        all_events = []
         successful_downloads = 0
         failed_downloads = 0
+        total_events = 0
 
         print(f"Starting corporate events download for {len(symbols)} stocks")
         print("=" * 60)
 
-        for i, symbol in enumerate(symbols, 1):
-            print(f"[{i}/{len(symbols)}] Processing {symbol}...")
-
-            events = self.download_corporate_events(symbol)
-
-            if events is not None and not events.empty:
-                # Add symbol column to each event
-                events_copy = events.copy()
-                events_copy['symbol'] = symbol
-                all_events.append(events_copy)
-                successful_downloads += 1
-
-                filename = f"corporate_events_{symbol}.csv"
-                filepath = os.path.join("data/corporate_events", filename)
-
-                try:
-                    events_copy.to_csv(filepath, index=False)
-                    print(f"{symbol}: Corporate events saved to: {filepath}")
-                except Exception as e:
-                    print(f"Warning: Could not save CSV file: {e}")
-
+        # Each symbol's events are appended to one Parquet file as a row group,
+        # so only one symbol's rows are held in memory at a time. The file is
+        # written under a temp name and replaces the previous one only on success.
+        filepath = os.path.join(self.corporate_events_output_dir, "all_events.parquet")
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        writer = pq.ParquetWriter(tmp_path, _CORPORATE_EVENT_SCHEMA, compression="zstd")
+        completed = False
 
+        # Client pagination is blocking HTTPS, so overlap symbols on a bounded thread pool;
+        # the shared rate limiter keeps the combined request rate within the API quota
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_downloads) as executor:
+                downloads = executor.map(self.download_corporate_events, symbols)
+                for i, (symbol, events) in enumerate(zip(symbols, downloads), 1):
+                    print(f"[{i}/{len(symbols)}] Processing {symbol}...")
+
+                    if events is not None and not events.empty:
+                        # Add symbol column to each event
+                        events['symbol'] = symbol
+                        table = pa.Table.from_pandas(events, schema=_CORPORATE_EVENT_SCHEMA,
+                                                     preserve_index=False)
+                        writer.write_table(table)
+                        total_events += len(events)
+                        successful_downloads += 1
+
+                    else:
+                        failed_downloads += 1
+                        print(f"✗ Failed to download corporate events for {symbol}")
+            completed = True
+        finally:
+            writer.close()
+            # A failed run or one without any events keeps the previous combined file
+            if completed and total_events:
+                os.replace(tmp_path, filepath)
             else:
-                failed_downloads += 1
-                print(f"✗ Failed to download corporate events for {symbol}")
+                os.remove(tmp_path)
 
         print("=" * 60)
         print(f"Download Summary:")
@@ -347,11 +751,11 @@ class DataDownloader:
         print(f"✗ Failed: {failed_downloads}")
         print(f"Total processed: {len(symbols)}")
 
-        # Combine all DataFrames
-        if all_events:
-            combined_df = pd.concat(all_events, ignore_index=True)
-            print(f"Total events: {len(combined_df)}")
-            return combined_df
+        # Read the combined file back only once all symbols are written
+        if total_events:
+            print(f"Corporate events saved to: {filepath}")
+            print(f"Total events: {total_events}")
+            return pd.read_parquet(filepath)
         else:
             return pd.DataFrame()
 
@@ -404,12 +808,16 @@ class DataDownloader:
             print(f"Error downloading all corporate events: {e}")
             return pd.DataFrame()
 
-    def download_fundamentals(self, symbol: str) -> Optional[pd.DataFrame]:
+    def download_fundamentals(self, symbol: str,
+                              fields: Optional[Iterable[str]] = None) -> Optional[pd.DataFrame]:
         """
         Download fundamental data for a single stock from Polygon.io using the official Python client
 
         Args:
             symbol: Stock ticker symbol
+            fields: Columns to keep (subset of _FUNDAMENTAL_FIELDS, e.g.
+                FUNDAMENTAL_METADATA_FIELDS to skip the nested financials);
+                only these attributes are read from each record. Default: all
 
         Returns:
             DataFrame with fundamental data or None if failed
@@ -418,57 +826,43 @@ class DataDownloader:
             print(f"Error: POLYGON_API_KEY not set. Cannot download fundamentals for {symbol}")
             return None
 
+        # Projection: read only the requested attributes, in the standard column order
+        columns = _FUNDAMENTAL_FIELDS
+        if fields is not None:
+            requested = set(fields)
+            unknown = requested.difference(_FUNDAMENTAL_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fundamentals fields: {sorted(unknown)}")
+            columns = [column for column in _FUNDAMENTAL_FIELDS if column in requested]
+
+        projection = columns if fields is not None else []
+        cache_key = FileCache.make_key('fundamentals', symbol, None, None, *projection)
+        df = self._read_cached(self._fundamentals_cache, cache_key)
+        if df is not None:
+            print(f"✓ Loaded {len(df)} cached fundamental records for {symbol}")
+            return df
+
         try:
             print(f"Downloading fundamental data for {symbol}...")
 
-            # Import the official Polygon.io client
-            try:
-                from polygon import RESTClient
-            except ImportError:
-                print("Error: 'polygon' package not installed. Please install it with: pip install polygon-api-client")
+            # Shared official Polygon.io client (None if the package is missing)
+            client = self._polygon_client
+            if client is None:
                 return None
 
-            # Initialize the REST client
-            client = RESTClient(self.polygon_api_key)
-
             # Use the official client to get fundamental data
             fundamentals = []
 
             try:
                 # Get fundamental data using the official client
-                financials = client.vx.list_stock_financials(
-                    ticker=symbol,
-                    limit=1000
-                )
+                with self._limiter:
+                    financials = list(client.vx.list_stock_financials(
+                        ticker=symbol,
+                        limit=1000
+                    ))
 
                 # Process fundamental data
-                for financial in financials:
-                    fundamental_entry = {
-                        'ticker': getattr(financial, 'ticker', symbol),
-                        'period_of_report_date': getattr(financial, 'period_of_report_date', None),
-                        'filing_date': getattr(financial, 'filing_date', None),
-                        'source_filing_file_url': getattr(financial, 'source_filing_file_url', None),
-                        'source_filing_url': getattr(financial, 'source_filing_url', None),
-                        'period_length': getattr(financial, 'period_length', None),
-                        'period_end_date': getattr(financial, 'period_end_date', None),
-                        'fiscal_period': getattr(financial, 'fiscal_period', None),
-                        'fiscal_year': getattr(financial, 'fiscal_year', None),
-                        'cik': getattr(financial, 'cik', None),
-                        'company_name': getattr(financial, 'company_name', None),
-                        'sic_code': getattr(financial, 'sic_code', None),
-                        'sic_description': getattr(financial, 'sic_description', None),
-                        'naics_code': getattr(financial, 'naics_code', None),
-                        'naics_description': getattr(financial, 'naics_description', None),
-                        'filing_url': getattr(financial, 'filing_url', None),
-                        'filing_title': getattr(financial, 'filing_title', None),
-                        'filing_date_str': getattr(financial, 'filing_date_str', None),
-                        'period_of_report_date_str': getattr(financial, 'period_of_report_date_str', None),
-                        'period_end_date_str': getattr(financial, 'period_end_date_str', None),
-                        'filing_href': getattr(financial, 'filing_href', None),
-                        'financials': getattr(financial, 'financials', None)
-                    }
-
-                    fundamentals.append(fundamental_entry)
+                fundamentals = _attribute_rows(financials, columns, {'ticker': symbol})
 
             except Exception as e:
                 print(f"Error retrieving fundamentals from client: {e}")
@@ -476,13 +870,16 @@ class DataDownloader:
 
             # Convert to DataFrame and sort by period end date (most recent first)
             if fundamentals:
-                df = pd.DataFrame(fundamentals)
+                df = pd.DataFrame(fundamentals, columns=columns)
                 # Convert date columns to datetime for sorting
                 date_columns = ['period_of_report_date', 'filing_date', 'period_end_date']
                 for col in date_columns:
                     if col in df.columns:
                         df[col] = pd.to_datetime(df[col], errors='coerce')
 
+                categories = [column for column in _FUNDAMENTAL_CATEGORIES if column in df.columns]
+                df[categories] = df[categories].astype('category')
+
                 # Sort by period end date (most recent first)
                 if 'period_end_date' in df.columns:
                     df = df.sort_values('period_end_date', ascending=False, na_position='last')
@@ -492,21 +889,21 @@ class DataDownloader:
                 df = pd.DataFrame()
                 print(f"✓ No fundamental data found for {symbol}")
 
-            # Rate limiting
-            time.sleep(self.polygon_rate_limit)
-
+            self._write_cached(self._fundamentals_cache, cache_key, df)
             return df
 
         except Exception as e:
             print(f"Error downloading fundamental data for {symbol}: {e}")
             return None
 
-    def download_multiple_fundamentals(self, symbols: List[str]) -> pd.DataFrame:
+    def download_multiple_fundamentals(self, symbols: List[str],
+                                       fields: Optional[Iterable[str]] = None) -> pd.DataFrame:
         """
         Download fundamental data for multiple stocks from Polygon.io
 
         Args:
             symbols: List of stock tickers
+            fields: Columns to keep per record (see download_fundamentals). Default: all
 
         Returns:
             DataFrame with fundamental data and a symbols column
@@ -518,21 +915,22 @@ class DataDownloader:
         print(f"Starting fundamental data download for {len(symbols)} stocks")
         print("=" * 60)
 
-        for i, symbol in enumerate(symbols, 1):
-            print(f"[{i}/{len(symbols)}] Processing {symbol}...")
-
-            fundamentals = self.download_fundamentals(symbol)
-
-            if fundamentals is not None and not fundamentals.empty:
-                # Add symbol column to each fundamental record
-                fundamentals_copy = fundamentals.copy()
-                fundamentals_copy['symbol'] = symbol
-                all_fundamentals.append(fundamentals_copy)
-                successful_downloads += 1
-                print(f"  ✓ Found {len(fundamentals)} fundamental records")
-            else:
-                failed_downloads += 1
-                print(f"  ✗ No fundamental data found")
+        # Overlap the blocking client calls across symbols; the shared rate limiter caps the rate
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_downloads) as executor:
+            downloads = executor.map(self.download_fundamentals, symbols,
+                                     [fields] * len(symbols))
+            for i, (symbol, fundamentals) in enumerate(zip(symbols, downloads), 1):
+                print(f"[{i}/{len(symbols)}] Processing {symbol}...")
+
+                if fundamentals is not None and not fundamentals.empty:
+                    # Add symbol column to each fundamental record
+                    fundamentals['symbol'] = symbol
+                    all_fundamentals.append(fundamentals)
+                    successful_downloads += 1
+                    print(f"  ✓ Found {len(fundamentals)} fundamental records")
+                else:
+                    failed_downloads += 1
+                    print(f"  ✗ No fundamental data found")
 
         print("=" * 60)
         print(f"Download Summary:")
@@ -543,6 +941,10 @@ class DataDownloader:
         # Combine all DataFrames
         if all_fundamentals:
             combined_df = pd.concat(all_fundamentals, ignore_index=True)
+            # Categories differ per symbol, so concat falls back to object; re-encode once
+            categories = [column for column in _FUNDAMENTAL_CATEGORIES + ['symbol']
+                          if column in combined_df.columns]
+            combined_df[categories] = combined_df[categories].astype('category')
             print(f"Total fundamental records: {len(combined_df)}")
             return combined_df
         else:
@@ -601,7 +1003,31 @@ class DataDownloader:
         """Create fundamentals output directory if it doesn't exist"""
         os.makedirs("data/fundamentals", exist_ok=True)
 
-    def get_polygon_tickers_all(self, market: str = "stocks", active: bool = True, limit: int = 1000) -> Optional[List[Dict[str, Any]]]:
+    def _iter_polygon_tickers(self, market: str = "stocks", active: bool = True,
+                              limit: int = 1000):
+        """
+        Yield the raw ticker objects from the client's paginated listing
+
+        Raises:
+            RuntimeError: If the API key or the polygon package is missing
+        """
+        if not self.polygon_api_key:
+            raise RuntimeError("POLYGON_API_KEY not set. Cannot retrieve tickers from Polygon.io")
+
+        # Shared official Polygon.io client (None if the package is missing)
+        client = self._polygon_client
+        if client is None:
+            raise RuntimeError("'polygon' package not installed")
+
+        yield from client.list_tickers(
+            market=market,
+            active=str(active).lower(),
+            order="asc",
+            limit=str(limit),
+            sort="ticker"
+        )
+
+    def get_polygon_tickers_all(self, market: str = "stocks", active: bool = True, limit: int = 1000) -> Optional[pd.DataFrame]:
         """
         Retrieve a complete list of tickers supported by Polygon.io using the official Python client
 
@@ -611,58 +1037,25 @@ class DataDownloader:
             limit: Maximum number of results per request (default: 1000, max: 1000)
 
         Returns:
-            List of ticker dictionaries or None if failed
+            DataFrame with one row per ticker (columns from _TICKER_FIELDS) or None if failed
         """
-        if not self.polygon_api_key:
-            print("Error: POLYGON_API_KEY not set. Cannot retrieve tickers from Polygon.io")
-            return None
-
         try:
             print(f"Retrieving all {market} tickers from Polygon.io...")
 
-            # Import the official Polygon.io client
-            try:
-                from polygon import RESTClient
-            except ImportError:
-                print("Error: 'polygon' package not installed. Please install it with: pip install polygon-api-client")
-                return None
-
-            # Initialize the REST client
-            client = RESTClient(self.polygon_api_key)
-
-            all_tickers = []
-
-            # Use the official client to iterate through all tickers
-            for ticker in client.list_tickers(
-                market=market,
-                active=str(active).lower(),
-                order="asc",
-                limit=str(limit),
-                sort="ticker"
-            ):
-                # Convert ticker object to dictionary
-                ticker_dict = {
-                    'ticker': ticker.ticker,
-                    'name': getattr(ticker, 'name', None),
-                    'market': getattr(ticker, 'market', None),
-                    'locale': getattr(ticker, 'locale', None),
-                    'primary_exchange': getattr(ticker, 'primary_exchange', None),
-                    'type': getattr(ticker, 'type', None),
-                    'active': getattr(ticker, 'active', None),
-                    'currency_name': getattr(ticker, 'currency_name', None),
-                    'cik': getattr(ticker, 'cik', None),
-                    'composite_figi': getattr(ticker, 'composite_figi', None),
-                    'share_class_figi': getattr(ticker, 'share_class_figi', None),
-                    'last_updated_utc': getattr(ticker, 'last_updated_utc', None)
-                }
-                all_tickers.append(ticker_dict)
+            # Collect each ticker attribute straight into its column
+            columns = {field: [] for field in _TICKER_FIELDS}
+            count = 0
+            for ticker in self._iter_polygon_tickers(market, active, limit):
+                for field, values in columns.items():
+                    values.append(getattr(ticker, field, None))
+                count += 1
 
                 # Progress indicator for large datasets
-                if len(all_tickers) % 1000 == 0:
-                    print(f"  Retrieved {len(all_tickers)} tickers...")
+                if count % 1000 == 0:
+                    print(f"  Retrieved {count} tickers...")
 
-            print(f"✓ Successfully retrieved {len(all_tickers)} total tickers")
-            return all_tickers
+            print(f"✓ Successfully retrieved {count} total tickers")
+            return pd.DataFrame(columns)
 
         except Exception as e:
             print(f"Error retrieving tickers from Polygon.io: {e}")
@@ -672,6 +1065,8 @@ class DataDownloader:
         """
         Get just the ticker symbols as a list from Polygon.io
 
+        Streams the listing and keeps only each ticker's symbol.
+
         Args:
             market: Market type (default: "stocks")
             active: Whether to return only active tickers (default: True)
@@ -679,9 +1074,21 @@ class DataDownloader:
         Returns:
             List of ticker symbols or None if failed
         """
-        tickers = self.get_polygon_tickers_all(market, active)
-        if tickers:
-            return [ticker['ticker'] for ticker in tickers if ticker.get('ticker')]
-        return None
+        # The full listing pages through every ticker, so reuse it within this downloader
+        cached = self._ticker_symbols.get((market, active))
+        if cached is not None:
+            return list(cached)
 
+        try:
+            print(f"Retrieving all {market} ticker symbols from Polygon.io...")
+            symbols = [ticker.ticker for ticker in self._iter_polygon_tickers(market, active)
+                       if ticker.ticker]
+            print(f"✓ Successfully retrieved {len(symbols)} ticker symbols")
+            if not symbols:
+                return None
+            self._ticker_symbols[(market, active)] = tuple(symbols)
+            return symbols
 
+        except Exception as e:
+            print(f"Error retrieving tickers from Polygon.io: {e}")
+            return None
@@ -39,6 +39,26 @@ class BasePattern(ABC):
         """
         pass
 
+    @staticmethod
+    def _signals_from_patterns(patterns: pd.Series) -> pd.Series:
+        """
+        Convert detected patterns to trading signals
+
+        Args:
+            patterns: Output of detect()
+
+        Returns:
+            pd.Series with signal values: 1 (buy), -1 (sell), 0 (no signal)
+        """
+        values = patterns.to_numpy()
+        signals = np.zeros(len(values), dtype=np.int64)
+
+        # Bullish patterns = buy signal, bearish patterns = sell signal
+        signals[values == 1] = 1
+        signals[values == -1] = -1
+
+        return pd.Series(signals, index=patterns.index)
+
     def validate_data(self, df: pd.DataFrame) -> bool:
         """
         Validate that DataFrame has required columns and data
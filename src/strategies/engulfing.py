@@ -26,43 +26,45 @@ class EngulfingPattern(BasePattern):
             pd.Series with values: 1 (bullish engulfing), -1 (bearish engulfing), 0 (no pattern)
         """
         if not self.validate_data(df):
-            return pd.Series([0] * len(df), index=df.index)
-
-        # Initialize result series
-        patterns = pd.Series([0] * len(df), index=df.index)
+            return pd.Series(np.zeros(len(df), dtype=np.int8), index=df.index)
 
         # Need at least 2 candles for engulfing pattern
         if len(df) < 2:
-            return patterns
+            return pd.Series(np.zeros(len(df), dtype=np.int8), index=df.index)
 
         # Get OHLC data
-        opens = df['open'].values
-        highs = df['high'].values
-        lows = df['low'].values
-        closes = df['close'].values
-
-        # Detect patterns starting from second candle (index 1)
-        for i in range(1, len(df)):
-            prev_open = opens[i-1]
-            prev_close = closes[i-1]
-            curr_open = opens[i]
-            curr_close = closes[i]
-
-            # Bullish engulfing: current candle completely engulfs previous bearish candle
-            if (prev_close < prev_open and  # Previous candle is bearish
-                curr_close > curr_open and   # Current candle is bullish
-                curr_open < prev_close and   # Current open below previous close
-                curr_close > prev_open):     # Current close above previous open
-
-                patterns.iloc[i] = 1  # Bullish engulfing
-
-            # Bearish engulfing: current candle completely engulfs previous bullish candle
-            elif (prev_close > prev_open and  # Previous candle is bullish
-                  curr_close < curr_open and   # Current candle is bearish
-                  curr_open > prev_close and   # Current open above previous close
-                  curr_close < prev_open):     # Current close below previous open
-
-                patterns.iloc[i] = -1  # Bearish engulfing
+        columns = [df[column].to_numpy() for column in ('open', 'high', 'low', 'close', 'volume')]
+        return pd.Series(self.detect_arrays(*columns), index=df.index)
+
+    def detect_arrays(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                      closes: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+        """
+        Detect engulfing patterns on raw OHLCV column arrays (no validation)
+
+        Only opens and closes are used; the full OHLCV signature matches
+        ReversalPatterns.detect_arrays so both detectors take the same arrays.
+
+        Returns:
+            int8 array: 1 (bullish engulfing), -1 (bearish engulfing), 0 (no pattern)
+        """
+        if len(closes) < 2:
+            return np.zeros(len(closes), dtype=np.int8)
+
+        # Candle direction as an int8 sign (+1 up, -1 down, 0 flat or NaN) and body edges
+        direction = (closes > opens).astype(np.int8) - (closes < opens).astype(np.int8)
+        body_low = np.minimum(opens, closes)
+        body_high = np.maximum(opens, closes)
+
+        # Engulfing: the current body reverses a non-flat previous candle and strictly
+        # contains its body (bullish when the current candle is up, bearish when down)
+        engulfing = ((direction[:-1] != 0) &
+                     (direction[1:] == -direction[:-1]) &
+                     (body_low[1:] < body_low[:-1]) &
+                     (body_high[1:] > body_high[:-1]))
+
+        # The current candle's direction is the pattern value: 1 bullish, -1 bearish
+        patterns = np.zeros(len(closes), dtype=np.int8)
+        patterns[1:][engulfing] = direction[1:][engulfing]
 
         return patterns
 
@@ -76,18 +78,7 @@ class EngulfingPattern(BasePattern):
         Returns:
             pd.Series with signal values: 1 (buy), -1 (sell), 0 (no signal)
         """
-        patterns = self.detect(df)
-
-        # Convert pattern detection to trading signals
-        signals = pd.Series([0] * len(df), index=df.index)
-
-        # Bullish engulfing = buy signal
-        signals[patterns == 1] = 1
-
-        # Bearish engulfing = sell signal
-        signals[patterns == -1] = -1
-
-        return signals
+        return self._signals_from_patterns(self.detect(df))
 
     def get_pattern_details(self, df: pd.DataFrame) -> Dict[str, pd.Series]:
         """
@@ -99,11 +90,12 @@ class EngulfingPattern(BasePattern):
         Returns:
             Dictionary with pattern details
         """
+        # Detect once and derive the signals from the same patterns
         patterns = self.detect(df)
 
         return {
             'patterns': patterns,
-            'signals': self.get_signal(df),
+            'signals': self._signals_from_patterns(patterns),
             'bullish_count': (patterns == 1).sum(),
             'bearish_count': (patterns == -1).sum(),
             'total_patterns': (patterns != 0).sum()
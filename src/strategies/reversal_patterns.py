@@ -26,211 +26,219 @@ class ReversalPatterns(BasePattern):
             pd.Series with values: 1 (bullish reversal), -1 (bearish reversal), 0 (no pattern)
         """
         if not self.validate_data(df):
-            return pd.Series([0] * len(df), index=df.index)
-
-        # Initialize result series
-        patterns = pd.Series([0] * len(df), index=df.index)
+            return pd.Series(np.zeros(len(df), dtype=np.int8), index=df.index)
 
         # Need at least 3 candles for some patterns
         if len(df) < 3:
+            return pd.Series(np.zeros(len(df), dtype=np.int8), index=df.index)
+
+        columns = [df[column].to_numpy(dtype=np.float64)
+                   for column in ('open', 'high', 'low', 'close', 'volume')]
+        return pd.Series(self.detect_arrays(*columns), index=df.index)
+
+    def detect_arrays(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                      closes: np.ndarray, volumes: np.ndarray,
+                      masks: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """
+        Detect reversal patterns on raw OHLCV column arrays (no validation)
+
+        Args:
+            opens, highs, lows, closes, volumes: Equal-length float arrays
+            masks: Optional precomputed _masks_from_arrays() result for these arrays
+
+        Returns:
+            int8 array: 1 (bullish reversal), -1 (bearish reversal), 0 (no pattern)
+        """
+        patterns = np.zeros(len(closes), dtype=np.int8)
+        if len(closes) < 3:
             return patterns
+        if masks is None:
+            masks = self._masks_from_arrays(opens, highs, lows, closes, volumes)
 
-        # Get OHLC data
-        opens = df['open'].values
-        highs = df['high'].values
-        lows = df['low'].values
-        closes = df['close'].values
-
-        # Detect patterns starting from second candle (index 1)
-        for i in range(1, len(df)):
-            # Single candle patterns
-            prev_close = closes[i-1] if i > 0 else None
-            if self._is_hammer(df, i, prev_close):
-                patterns.iloc[i] = 1  # Bullish reversal
-            elif self._is_shooting_star(opens[i], highs[i], lows[i], closes[i]):
-                patterns.iloc[i] = -1  # Bearish reversal
-            elif self._is_doji(opens[i], highs[i], lows[i], closes[i]):
-                # Doji is neutral, but can be reversal in context
-                patterns.iloc[i] = self._analyze_doji_context(df, i)
-
-            # Multi-candle patterns (need at least 3 candles)
-            if i >= 2:
-                if self._is_morning_star(df, i):
-                    patterns.iloc[i] = 1  # Bullish reversal
-                elif self._is_evening_star(df, i):
-                    patterns.iloc[i] = -1  # Bearish reversal
+        # Single candle patterns, written lowest precedence first (hammer > shooting star > doji)
+        doji = masks['doji']
+        patterns[doji] = self._doji_context(closes)[doji]
+        patterns[masks['shooting_star']] = -1  # Bearish reversal
+        patterns[masks['hammer']] = 1  # Bullish reversal
+
+        # Multi-candle patterns override single candle ones (morning star > evening star)
+        patterns[masks['evening_star']] = -1  # Bearish reversal
+        patterns[masks['morning_star']] = 1  # Bullish reversal
 
         return patterns
 
-    def _is_hammer(self, df: pd.DataFrame, index: int, prev_close: float = None) -> bool:
+    def _pattern_masks(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Boolean mask per pattern type over all candles
+
+        Single candle masks are exclusive in precedence order (a hammer is never
+        also counted as a shooting star or doji), as are the two star masks.
+        The first candle never carries a pattern.
+        """
+        return self._masks_from_arrays(*(df[column].to_numpy(dtype=np.float64)
+                                         for column in ('open', 'high', 'low', 'close', 'volume')))
+
+    def _masks_from_arrays(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                           closes: np.ndarray, volumes: np.ndarray) -> Dict[str, np.ndarray]:
+        """_pattern_masks() on raw OHLCV column arrays"""
+        hammer = self._hammer_mask(opens, highs, lows, closes, volumes)
+        shooting_star = self._shooting_star_mask(opens, highs, lows, closes) & ~hammer
+        doji = self._doji_mask(opens, highs, lows, closes) & ~hammer & ~shooting_star
+        for mask in (hammer, shooting_star, doji):
+            mask[:1] = False
+
+        morning_star = self._morning_star_mask(opens, closes)
+        evening_star = self._evening_star_mask(opens, closes) & ~morning_star
+
+        return {
+            'hammer': hammer,
+            'shooting_star': shooting_star,
+            'doji': doji,
+            'morning_star': morning_star,
+            'evening_star': evening_star
+        }
+
+    @staticmethod
+    def _candle_parts(opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                      closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Body, lower shadow, upper shadow and total range of every candle"""
+        body = np.abs(closes - opens)
+        lower_shadow = np.minimum(opens, closes) - lows
+        upper_shadow = highs - np.maximum(opens, closes)
+        return body, lower_shadow, upper_shadow, highs - lows
+
+    @staticmethod
+    def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """Elementwise numerator / denominator, 0 where the denominator is 0"""
+        out = np.zeros_like(numerator)
+        np.divide(numerator, denominator, out=out, where=denominator != 0)
+        return out
+
+    def _hammer_mask(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                     closes: np.ndarray, volumes: np.ndarray) -> np.ndarray:
         """Detect hammer pattern (bullish reversal) with volume and downtrend conditions"""
-        if index < 20:  # Need at least 20 days for volume average
-            return False
-
-        open_price = df.iloc[index]['open']
-        high = df.iloc[index]['high']
-        low = df.iloc[index]['low']
-        close = df.iloc[index]['close']
-        volume = df.iloc[index]['volume']
-
-        # Calculate 20-day average volume
-        volume_20d_avg = df.iloc[max(0, index-20):index]['volume'].mean()
-        volume_condition = volume > (1.5 * volume_20d_avg)
-
-        # Check for downtrend: at least 3 consecutive down days
-        downtrend_condition = False
-        if index >= 3:
-            # Check if the last 3 days were down days (close < open)
-            down_days = 0
-            for i in range(index-3, index):
-                if df.iloc[i]['close'] < df.iloc[i]['open']:
-                    down_days += 1
-                else:
-                    down_days = 0  # Reset counter if not a down day
-            downtrend_condition = down_days >= 3
-
-        body = abs(close - open_price)
-        lower_shadow = min(open_price, close) - low
-        upper_shadow = high - max(open_price, close)
+        n = len(closes)
+        hammer = np.zeros(n, dtype=bool)
+        if n <= 20:  # Need at least 20 days for volume average
+            return hammer
+
+        # Volume > 1.5x the average of the previous 20 days
+        volume_20d_avg = np.lib.stride_tricks.sliding_window_view(volumes[:-1], 20).mean(axis=1)
+        volume_condition = volumes[20:] > (1.5 * volume_20d_avg)
+
+        # Downtrend: the previous 3 days were all down days (close < open)
+        down = closes < opens
+        downtrend_condition = down[17:-3] & down[18:-2] & down[19:-1]
+
+        body, lower_shadow, upper_shadow, total_range = self._candle_parts(opens, highs, lows, closes)
 
         # Hammer criteria:
         # 1. Small body (less than 30% of total range)
         # 2. Long lower shadow (at least 2x body)
         # 3. Small or no upper shadow
-        # 4. Opens below previous close (if prev_close provided)
+        # 4. Opens below previous close
         # 5. Close above today's open
         # 6. Volume > 1.5x 20-day average
         # 7. Stock must be in downtrend (at least 3 consecutive down days)
-        total_range = high - low
-        if total_range == 0 or close < open_price:
-            return False
+        candle = ((total_range != 0) & (closes >= opens) &
+                  (self._ratio(body, total_range) < 0.3) &
+                  (self._ratio(lower_shadow, body) >= 2.0) &
+                  (self._ratio(upper_shadow, total_range) < 0.1))
+        candle[1:] &= opens[1:] < closes[:-1]
 
-        body_ratio = body / total_range
-        shadow_ratio = lower_shadow / body if body > 0 else 0
-        upper_ratio = upper_shadow / total_range
+        hammer[20:] = candle[20:] & volume_condition & downtrend_condition
+        return hammer
 
-        # Basic hammer criteria
-        hammer_criteria = (body_ratio < 0.3 and
-                          shadow_ratio >= 2.0 and
-                          upper_ratio < 0.1 and
-                          volume_condition and
-                          downtrend_condition)
-
-        # Additional condition: opens below previous close
-        if prev_close is not None:
-            hammer_criteria = hammer_criteria and (open_price < prev_close)
-
-        return hammer_criteria
-
-    def _is_shooting_star(self, open_price: float, high: float, low: float, close: float) -> bool:
+    def _shooting_star_mask(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                            closes: np.ndarray) -> np.ndarray:
         """Detect shooting star pattern (bearish reversal)"""
-        body = abs(close - open_price)
-        lower_shadow = min(open_price, close) - low
-        upper_shadow = high - max(open_price, close)
+        body, lower_shadow, upper_shadow, total_range = self._candle_parts(opens, highs, lows, closes)
 
         # Shooting star criteria:
         # 1. Small body (less than 30% of total range)
         # 2. Long upper shadow (at least 2x body)
         # 3. Small or no lower shadow
-        total_range = high - low
-        if total_range == 0:
-            return False
+        return ((total_range != 0) &
+                (self._ratio(body, total_range) < 0.3) &
+                (self._ratio(upper_shadow, body) >= 2.0) &
+                (self._ratio(lower_shadow, total_range) < 0.1))
 
-        body_ratio = body / total_range
-        shadow_ratio = upper_shadow / body if body > 0 else 0
-        lower_ratio = lower_shadow / total_range
+    def _doji_mask(self, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                   closes: np.ndarray) -> np.ndarray:
+        """Detect doji pattern (neutral, potential reversal)"""
+        body = np.abs(closes - opens)
+        total_range = highs - lows
 
-        return (body_ratio < 0.3 and
-                shadow_ratio >= 2.0 and
-                lower_ratio < 0.1)
+        # Doji criteria: very small body (less than 10% of total range)
+        return (total_range != 0) & (self._ratio(body, total_range) < 0.1)
 
-    def _is_doji(self, open_price: float, high: float, low: float, close: float) -> bool:
-        """Detect doji pattern (neutral, potential reversal)"""
-        body = abs(close - open_price)
-        total_range = high - low
+    @staticmethod
+    def _doji_context(closes: np.ndarray) -> np.ndarray:
+        """Reversal direction a doji would signal on each candle, from its neighbours' closes"""
+        context = np.zeros(len(closes), dtype=np.int8)
+        if len(closes) < 3:
+            return context
 
-        if total_range == 0:
-            return False
+        prev_close, curr_close, next_close = closes[:-2], closes[1:-1], closes[2:]
 
-        # Doji criteria: very small body (less than 10% of total range)
-        body_ratio = body / total_range
-        return body_ratio < 0.1
-
-    def _analyze_doji_context(self, df: pd.DataFrame, index: int) -> int:
-        """Analyze doji in context to determine reversal direction"""
-        if index == 0 or index >= len(df) - 1:
-            return 0
-
-        prev_close = df.iloc[index-1]['close']
-        curr_close = df.iloc[index]['close']
-        next_close = df.iloc[index+1]['close']
-
-        # If doji appears after downtrend and next candle is bullish
-        if prev_close > curr_close and next_close > curr_close:
-            return 1  # Bullish reversal
-        # If doji appears after uptrend and next candle is bearish
-        elif prev_close < curr_close and next_close < curr_close:
-            return -1  # Bearish reversal
-
-        return 0  # Neutral
-
-    def _is_morning_star(self, df: pd.DataFrame, index: int) -> bool:
-        """Detect morning star pattern (bullish reversal)"""
-        if index < 2:
-            return False
-
-        # Get the three candles
-        first_open = df.iloc[index-2]['open']
-        first_close = df.iloc[index-2]['close']
-        second_open = df.iloc[index-1]['open']
-        second_close = df.iloc[index-1]['close']
-        third_open = df.iloc[index]['open']
-        third_close = df.iloc[index]['close']
+        # Doji after a down move with a higher next close: bullish reversal;
+        # after an up move with a lower next close: bearish reversal (first/last candle: neutral)
+        context[1:-1][(prev_close > curr_close) & (next_close > curr_close)] = 1
+        context[1:-1][(prev_close < curr_close) & (next_close < curr_close)] = -1
+        return context
+
+    @staticmethod
+    def _three_candles(opens: np.ndarray, closes: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Open/close of the first, second and third candle of every 3-candle window"""
+        return opens[:-2], closes[:-2], opens[1:-1], closes[1:-1], opens[2:], closes[2:]
+
+    def _morning_star_mask(self, opens: np.ndarray, closes: np.ndarray) -> np.ndarray:
+        """Detect morning star pattern (bullish reversal), marked on the third candle"""
+        mask = np.zeros(len(closes), dtype=bool)
+        if len(closes) < 3:
+            return mask
+
+        first_open, first_close, second_open, second_close, third_open, third_close = \
+            self._three_candles(opens, closes)
 
         # Morning star criteria:
         # 1. First candle: bearish (close < open)
         # 2. Second candle: small body, gaps down from first
         # 3. Third candle: bullish, closes above midpoint of first candle
-        first_body = abs(first_close - first_open)
-        second_body = abs(second_close - second_open)
-        third_body = abs(third_close - third_open)
-
+        first_body = np.abs(first_close - first_open)
+        second_body = np.abs(second_close - second_open)
         first_midpoint = (first_open + first_close) / 2
 
-        return (first_close < first_open and  # First candle bearish
-                second_body < first_body * 0.3 and  # Second candle small
-                second_close < first_close and  # Second candle gaps down
-                third_close > third_open and  # Third candle bullish
-                third_close > first_midpoint)  # Third candle closes above midpoint
-
-    def _is_evening_star(self, df: pd.DataFrame, index: int) -> bool:
-        """Detect evening star pattern (bearish reversal)"""
-        if index < 2:
-            return False
-
-        # Get the three candles
-        first_open = df.iloc[index-2]['open']
-        first_close = df.iloc[index-2]['close']
-        second_open = df.iloc[index-1]['open']
-        second_close = df.iloc[index-1]['close']
-        third_open = df.iloc[index]['open']
-        third_close = df.iloc[index]['close']
+        mask[2:] = ((first_close < first_open) &  # First candle bearish
+                    (second_body < first_body * 0.3) &  # Second candle small
+                    (second_close < first_close) &  # Second candle gaps down
+                    (third_close > third_open) &  # Third candle bullish
+                    (third_close > first_midpoint))  # Third candle closes above midpoint
+        return mask
+
+    def _evening_star_mask(self, opens: np.ndarray, closes: np.ndarray) -> np.ndarray:
+        """Detect evening star pattern (bearish reversal), marked on the third candle"""
+        mask = np.zeros(len(closes), dtype=bool)
+        if len(closes) < 3:
+            return mask
+
+        first_open, first_close, second_open, second_close, third_open, third_close = \
+            self._three_candles(opens, closes)
 
         # Evening star criteria:
         # 1. First candle: bullish (close > open)
         # 2. Second candle: small body, gaps up from first
         # 3. Third candle: bearish, closes below midpoint of first candle
-        first_body = abs(first_close - first_open)
-        second_body = abs(second_close - second_open)
-        third_body = abs(third_close - third_open)
-
+        first_body = np.abs(first_close - first_open)
+        second_body = np.abs(second_close - second_open)
         first_midpoint = (first_open + first_close) / 2
 
-        return (first_close > first_open and  # First candle bullish
-                second_body < first_body * 0.3 and  # Second candle small
-                second_close > first_close and  # Second candle gaps up
-                third_close < third_open and  # Third candle bearish
-                third_close < first_midpoint)  # Third candle closes below midpoint
+        mask[2:] = ((first_close > first_open) &  # First candle bullish
+                    (second_body < first_body * 0.3) &  # Second candle small
+                    (second_close > first_close) &  # Second candle gaps up
+                    (third_close < third_open) &  # Third candle bearish
+                    (third_close < first_midpoint))  # Third candle closes below midpoint
+        return mask
 
     def get_signal(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -242,18 +250,7 @@ class ReversalPatterns(BasePattern):
         Returns:
             pd.Series with signal values: 1 (buy), -1 (sell), 0 (no signal)
         """
-        patterns = self.detect(df)
-
-        # Convert pattern detection to trading signals
-        signals = pd.Series([0] * len(df), index=df.index)
-
-        # Bullish reversal patterns = buy signal
-        signals[patterns == 1] = 1
-
-        # Bearish reversal patterns = sell signal
-        signals[patterns == -1] = -1
-
-        return signals
+        return self._signals_from_patterns(self.detect(df))
 
     def get_pattern_details(self, df: pd.DataFrame) -> Dict[str, pd.Series]:
         """
@@ -265,11 +262,12 @@ class ReversalPatterns(BasePattern):
         Returns:
             Dictionary with pattern details
         """
+        # Detect once and derive the signals from the same patterns
         patterns = self.detect(df)
 
         return {
             'patterns': patterns,
-            'signals': self.get_signal(df),
+            'signals': self._signals_from_patterns(patterns),
             'bullish_count': (patterns == 1).sum(),
             'bearish_count': (patterns == -1).sum(),
             'total_patterns': (patterns != 0).sum()
@@ -288,32 +286,7 @@ class ReversalPatterns(BasePattern):
         if not self.validate_data(df):
             return {}
 
-        opens = df['open'].values
-        highs = df['high'].values
-        lows = df['low'].values
-        closes = df['close'].values
-
-        pattern_counts = {
-            'hammer': 0,
-            'shooting_star': 0,
-            'doji': 0,
-            'morning_star': 0,
-            'evening_star': 0
-        }
-
-        for i in range(1, len(df)):
-            prev_close = closes[i-1] if i > 0 else None
-            if self._is_hammer(df, i, prev_close):
-                pattern_counts['hammer'] += 1
-            elif self._is_shooting_star(opens[i], highs[i], lows[i], closes[i]):
-                pattern_counts['shooting_star'] += 1
-            elif self._is_doji(opens[i], highs[i], lows[i], closes[i]):
-                pattern_counts['doji'] += 1
-
-            if i >= 2:
-                if self._is_morning_star(df, i):
-                    pattern_counts['morning_star'] += 1
-                elif self._is_evening_star(df, i):
-                    pattern_counts['evening_star'] += 1
+        masks = self._pattern_masks(df)
+        pattern_counts = {name: int(mask.sum()) for name, mask in masks.items()}
 
         return pattern_counts
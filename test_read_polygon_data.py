@@ -4,11 +4,102 @@ Simplified test script to read stock OHLCV data from Polygon data folder
 """
 import os
 import pandas as pd
-import gzip
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
-import glob
+from concurrent.futures import ProcessPoolExecutor
 
-def read_polygon_data(data_path: str, start_date: str = None, end_date: str = None):
+# Per-file columns read from the flat files and their Arrow types
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+OHLCV_TYPES = {'ticker': pa.string(), 'open': pa.float32(), 'high': pa.float32(),
+               'low': pa.float32(), 'close': pa.float32(), 'volume': pa.int64()}
+
+def _load_one(file_path: str, start_dt: datetime = None, end_dt: datetime = None,
+              verbose: bool = False):
+    """
+    Read one daily flat file into a normalized OHLCV frame (process pool worker)
+
+    Returns:
+        Arrow table with columns: symbol, date, open, high, low, close, volume, or
+        None if the file is skipped or cannot be read
+    """
+    # Extract date from filename
+    filename = os.path.basename(file_path)
+    if not filename.endswith('.csv.gz'):
+        return None
+
+    date_str = filename.replace('.csv.gz', '')
+    try:
+        file_date = datetime.strptime(date_str, "%Y-%m-%d")
+
+        # Additional date filter check (in case of edge cases)
+        if start_dt and file_date < start_dt:
+            return None
+        if end_dt and file_date > end_dt:
+            return None
+
+        # A sibling Parquet copy written on an earlier run skips the gzip + CSV parse
+        cache_path = file_path[:-len('.csv.gz')] + '.parquet'
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+                if verbose:
+                    print(f"Processing {filename} (cached)...")
+                return pq.read_table(cache_path)
+        except OSError:
+            pass
+
+        if verbose:
+            print(f"Processing {filename}...")
+
+        # Arrow's multi-threaded CSV reader decompresses .gz natively; only the needed
+        # columns are converted, straight to compact types
+        table = pacsv.read_csv(
+            file_path,
+            read_options=pacsv.ReadOptions(use_threads=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=['ticker', *OHLCV_COLUMNS],
+                column_types=OHLCV_TYPES
+            )
+        )
+
+        # Column is named 'ticker' not 'symbol'; every row of a file shares its date
+        dates = pa.array(np.full(table.num_rows, np.datetime64(file_date, 'us')))
+        table = pa.table({
+            'symbol': table['ticker'],
+            'date': dates,
+            **{column: table[column] for column in OHLCV_COLUMNS}
+        })
+
+        # Written under a temp name first so an interrupted run never leaves a partial cache
+        try:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            pq.write_table(table, tmp_path, compression='zstd')
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not cache {filename} as Parquet: {e}")
+        return table
+
+    except Exception as e:
+        print(f"Error processing {filename}: {e}")
+        return None
+
+def _iter_csv_paths(data_path: str):
+    """Yield every year/month/*.csv.gz path under data_path, using scandir's cached entry types"""
+    for year in os.scandir(data_path):
+        if not year.is_dir(follow_symlinks=False):
+            continue
+        for month in os.scandir(year.path):
+            if not month.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(month.path):
+                if entry.name.endswith('.csv.gz') and entry.is_file(follow_symlinks=False):
+                    yield entry.path
+
+def read_polygon_data(data_path: str, start_date: str = None, end_date: str = None,
+                      verbose: bool = False):
     """
     Read stock OHLCV data from Polygon folder structure
 
@@ -16,12 +107,11 @@ def read_polygon_data(data_path: str, start_date: str = None, end_date: str = No
         data_path: Path to day_aggs_v1 folder
         start_date: Optional start date in YYYY-MM-DD format (if None, reads all files)
         end_date: Optional end date in YYYY-MM-DD format (if None, reads all files)
+        verbose: Print a line per processed file (summary lines are always printed)
 
     Returns:
         DataFrame with columns: symbol, date, open, high, low, close, volume
     """
-    all_records = []
-
     # Parse date filters if provided
     start_dt = None
     end_dt = None
@@ -32,91 +122,51 @@ def read_polygon_data(data_path: str, start_date: str = None, end_date: str = No
 
     # If date filters are provided, only get files for those dates
     if start_dt and end_dt:
-        # Generate list of dates in range
+        # File names for every date in range, grouped by their year/month directory
+        wanted = {}
         current_date = start_dt
-        target_files = []
-
         while current_date <= end_dt:
-            # Construct file path based on date
-            year = current_date.year
-            month = current_date.month
-            day = current_date.day
-
-            # Format date for filename
-            date_str = current_date.strftime("%Y-%m-%d")
-            filename = f"{date_str}.csv.gz"
-
-            # Construct full path
-            file_path = os.path.join(data_path, str(year), f"{month:02d}", filename)
-
-            if os.path.exists(file_path):
-                target_files.append(file_path)
-
-            # Move to next day
+            month_dir = os.path.join(data_path, str(current_date.year), f"{current_date.month:02d}")
+            wanted.setdefault(month_dir, set()).add(current_date.strftime("%Y-%m-%d") + ".csv.gz")
             current_date += timedelta(days=1)
 
+        # One directory listing per month instead of a stat per calendar day (weekends
+        # and holidays have no file)
+        target_files = []
+        for month_dir, names in wanted.items():
+            try:
+                with os.scandir(month_dir) as entries:
+                    target_files.extend(entry.path for entry in entries if entry.name in names)
+            except FileNotFoundError:
+                continue
+        target_files.sort()
+
         csv_files = target_files
         print(f"Date range specified: {start_date} to {end_date}")
         print(f"Looking for {len(csv_files)} specific files")
 
     else:
-        # Get all CSV files if no date filter
-        pattern = os.path.join(data_path, "**/*.csv.gz")
-        csv_files = glob.glob(pattern, recursive=True)
+        # Get all CSV files if no date filter (fixed year/month depth, so no recursive glob)
+        csv_files = sorted(_iter_csv_paths(data_path))
         print(f"No date filter - found {len(csv_files)} total CSV files")
 
-    processed_files = 0
-    for file_path in csv_files:
-        # Extract date from filename
-        filename = os.path.basename(file_path)
-        if not filename.endswith('.csv.gz'):
-            continue
-
-        date_str = filename.replace('.csv.gz', '')
-        try:
-            file_date = datetime.strptime(date_str, "%Y-%m-%d")
-
-            # Additional date filter check (in case of edge cases)
-            if start_dt and file_date < start_dt:
-                continue
-            if end_dt and file_date > end_dt:
-                continue
-
-            print(f"Processing {filename}...")
-
-            # Read compressed CSV
-            with gzip.open(file_path, 'rt') as f:
-                df = pd.read_csv(f)
-
-            # Process each stock in the file
-            for _, row in df.iterrows():
-                symbol = row['ticker']  # Column is named 'ticker' not 'symbol'
-
-                # Create stock record
-                record = {
-                    'symbol': symbol,
-                    'date': file_date,
-                    'open': row['open'],
-                    'high': row['high'],
-                    'low': row['low'],
-                    'close': row['close'],
-                    'volume': row['volume']
-                }
-
-                all_records.append(record)
-
-            processed_files += 1
-
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
-            continue
+    # Decompression and parsing are CPU-bound and independent per file, so fan out to processes
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        loaded = executor.map(_load_one, csv_files, [start_dt] * len(csv_files),
+                              [end_dt] * len(csv_files), [verbose] * len(csv_files), chunksize=4)
+        tables = [table for table in loaded if table is not None]
+    processed_files = len(tables)
 
     print(f"Successfully processed {processed_files} files")
 
-    # Create single DataFrame
-    if all_records:
-        result_df = pd.DataFrame(all_records)
-        result_df = result_df.sort_values(['symbol', 'date'])
+    # Create single DataFrame (one Arrow concat and sort, and a single pandas conversion).
+    # Files are in date order and Arrow's sort is stable, so sorting by symbol alone leaves
+    # each symbol's rows in date order. Symbols are dictionary-encoded after sorting, so
+    # they arrive as a categorical whose categories are already in sorted order
+    if tables:
+        table = pa.concat_tables(tables).sort_by([('symbol', 'ascending')])
+        table = table.set_column(0, 'symbol', pc.dictionary_encode(table['symbol']))
+        result_df = table.to_pandas()
         print(f"Total records: {len(result_df)}")
         print(f"Unique symbols: {result_df['symbol'].nunique()}")
         return result_df
@@ -9,8 +9,18 @@ from src.strategies.reversal_patterns import ReversalPatterns
 from src.strategies.engulfing import EngulfingPattern
 from test_read_polygon_data import read_polygon_data
 
-def test_reversal_patterns_with_polygon_data():
-    """Test reversal pattern detection with real Polygon data and generate comprehensive CSV"""
+# Output columns of the pattern analysis CSV, in order
+RECORD_COLUMNS = ['symbol', 'date', 'pattern_name', 'pattern_direction', 'price_at_pattern',
+                  'forward_1d_return', 'forward_5d_return', 'forward_10d_return',
+                  'forward_20d_return', 'backward_1d_return', 'backward_5d_return']
+
+def test_reversal_patterns_with_polygon_data(verbose: bool = False):
+    """
+    Test reversal pattern detection with real Polygon data and generate comprehensive CSV
+
+    Args:
+        verbose: Print a line per loaded file and analyzed symbol
+    """
     print("Testing Reversal Pattern Detection with Polygon Data")
     print("=" * 60)
 
@@ -27,7 +37,8 @@ def test_reversal_patterns_with_polygon_data():
     end_date = "2025-07-31"
 
     try:
-        stock_df = read_polygon_data(data_path, start_date=start_date, end_date=end_date)
+        stock_df = read_polygon_data(data_path, start_date=start_date, end_date=end_date,
+                                     verbose=verbose)
 
         if stock_df.empty:
             print("No data found for this period")
@@ -36,74 +47,71 @@ def test_reversal_patterns_with_polygon_data():
         print(f"Loaded data for {stock_df['symbol'].nunique()} stocks")
         print(f"Total records: {len(stock_df)}")
 
-        # Prepare data for CSV output
-        pattern_records = []
+        # Prepare data for CSV output: per-column lists of per-symbol arrays, joined once
+        record_columns = {column: [] for column in RECORD_COLUMNS}
 
         # Analyze stocks (limit to first 100 for performance)
         analyzed_stocks = 0
         max_stocks = 100
 
-        # Get unique symbols
-        unique_symbols = stock_df['symbol'].unique()
-
-        for symbol in unique_symbols:
+        # read_polygon_data returns rows sorted by (symbol, date), so one pass splits the
+        # frame into per-symbol blocks already in date order (everything below works on
+        # positional column arrays, so no reindexing)
+        for symbol, df in stock_df.groupby('symbol', observed=True, sort=False):
             if analyzed_stocks >= max_stocks:
                 break
 
-            # Get data for this symbol
-            df = stock_df[stock_df['symbol'] == symbol].copy()
-            df = df.sort_values('date').reset_index(drop=True)
-
             if len(df) < 10:  # Skip stocks with insufficient data for return calculation
                 continue
 
-            print(f"Analyzing {symbol} ({len(df)} records)...")
+            if verbose:
+                print(f"Analyzing {symbol} ({len(df)} records)...")
+
+            # Column arrays for the per-event lookups below; returns for every bar at once
+            dates = df['date'].to_numpy()
+            closes = df['close'].to_numpy()
+            returns = calculate_returns(closes)
+
+            # Both detectors share one set of raw column arrays; validate once up front
+            # (an invalid symbol yields no patterns, as detect() would)
+            if not reversal_detector.validate_data(df):
+                analyzed_stocks += 1
+                continue
+            ohlcv = [df[column].to_numpy(dtype=np.float64)
+                     for column in ('open', 'high', 'low', 'close', 'volume')]
 
-            # Detect reversal patterns
-            reversal_patterns = reversal_detector.detect(df)
-            reversal_breakdown = reversal_detector.get_pattern_breakdown(df)
+            # Detect reversal patterns and name every candle's pattern from the same masks
+            reversal_masks = reversal_detector._masks_from_arrays(*ohlcv)
+            reversal_patterns = reversal_detector.detect_arrays(*ohlcv, masks=reversal_masks)
+            reversal_names = get_pattern_names(reversal_masks)
 
             # Detect engulfing patterns
-            engulfing_patterns = engulfing_detector.detect(df)
+            engulfing_patterns = engulfing_detector.detect_arrays(*ohlcv)
 
-                        # Get pattern details for each occurrence
-            # Process both pattern types
+            # Get pattern details for each occurrence of both pattern types
             for pattern_type, patterns in [('reversal', reversal_patterns), ('engulfing', engulfing_patterns)]:
-                for i, (date, pattern) in enumerate(zip(df['date'], patterns)):
-                    if pattern != 0:
-                        # Get pattern name
-                        if pattern_type == 'reversal':
-                            pattern_name = get_specific_pattern_name(reversal_detector, df, i, reversal_breakdown)
-                        else:
-                            pattern_name = 'bullish_engulfing' if pattern == 1 else 'bearish_engulfing'
-
-                        # Calculate returns
-                        returns = {
-                            'forward_1d_return': calculate_forward_return(df, i, 1),
-                            'forward_5d_return': calculate_forward_return(df, i, 5),
-                            'forward_10d_return': calculate_forward_return(df, i, 10),
-                            'forward_20d_return': calculate_forward_return(df, i, 20),
-                            'backward_1d_return': calculate_backward_return(df, i, 1),
-                            'backward_5d_return': calculate_backward_return(df, i, 5)
-                        }
-
-                        # Create record
-                        record = {
-                            'symbol': symbol,
-                            'date': date.strftime('%Y-%m-%d'),
-                            'pattern_name': pattern_name,
-                            'pattern_direction': 'Bullish' if pattern == 1 else 'Bearish',
-                            'price_at_pattern': df.iloc[i]['close'],
-                            **returns
-                        }
-
-                        pattern_records.append(record)
+                hits = np.flatnonzero(patterns)
+                bullish = patterns[hits] == 1
+
+                if pattern_type == 'reversal':
+                    pattern_names = reversal_names[hits]
+                else:
+                    pattern_names = np.where(bullish, 'bullish_engulfing', 'bearish_engulfing')
+
+                record_columns['symbol'].append(np.full(len(hits), symbol, dtype=object))
+                record_columns['date'].append(dates[hits].astype('datetime64[D]').astype(str))
+                record_columns['pattern_name'].append(pattern_names)
+                record_columns['pattern_direction'].append(np.where(bullish, 'Bullish', 'Bearish'))
+                record_columns['price_at_pattern'].append(closes[hits])
+                for column, values in returns.items():
+                    record_columns[column].append(values[hits])
 
             analyzed_stocks += 1
 
         # Process and save results
-        if pattern_records:
-            results_df = pd.DataFrame(pattern_records)
+        results_df = pd.DataFrame({column: np.concatenate(chunks) for column, chunks in record_columns.items()
+                                   if chunks})
+        if len(results_df):
             output_file = 'reversal_pattern_analysis.csv'
             results_df.to_csv(output_file, index=False)
 
@@ -111,7 +119,7 @@ def test_reversal_patterns_with_polygon_data():
             print(f"\n{'='*60}")
             print("Analysis Complete!")
             print(f"{'='*60}")
-            print(f"Total patterns: {len(pattern_records)} | Stocks: {analyzed_stocks} | File: {output_file}")
+            print(f"Total patterns: {len(results_df)} | Stocks: {analyzed_stocks} | File: {output_file}")
 
             # Pattern counts
             print(f"\nPattern Summary:\n{results_df['pattern_name'].value_counts().to_string()}")
@@ -134,47 +142,27 @@ def test_reversal_patterns_with_polygon_data():
         import traceback
         traceback.print_exc()
 
-def get_specific_pattern_name(detector, df, index, breakdown):
-    """Get the specific name of the pattern at the given index"""
-    opens = df['open'].values
-    highs = df['high'].values
-    lows = df['low'].values
-    closes = df['close'].values
-
-    # Check each pattern type
-    prev_close = closes[index-1] if index > 0 else None
-    if detector._is_hammer(opens[index], highs[index], lows[index], closes[index], prev_close):
-        return 'hammer'
-    elif detector._is_shooting_star(opens[index], highs[index], lows[index], closes[index]):
-        return 'shooting_star'
-    elif detector._is_doji(opens[index], highs[index], lows[index], closes[index]):
-        return 'doji'
-    elif index >= 2 and detector._is_morning_star(df, index):
-        return 'morning_star'
-    elif index >= 2 and detector._is_evening_star(df, index):
-        return 'evening_star'
-    else:
-        return 'unknown'
-
-def calculate_forward_return(df, index, days):
-    """Calculate forward return for specified number of days"""
-    if index + days >= len(df):
-        return None  # Not enough forward data
-
-    current_price = df.iloc[index]['close']
-    future_price = df.iloc[index + days]['close']
-
-    return (future_price - current_price) / current_price
-
-def calculate_backward_return(df, index, days):
-    """Calculate backward return for specified number of days"""
-    if index - days < 0:
-        return None  # Not enough backward data
-
-    current_price = df.iloc[index]['close']
-    past_price = df.iloc[index - days]['close']
-
-    return (current_price - past_price) / past_price
+def get_pattern_names(masks):
+    """Name of the reversal pattern at every candle ('unknown' where none matches)"""
+    # First matching mask wins, in the detector's order: hammer, shooting_star, doji,
+    # morning_star, evening_star
+    return np.select(list(masks.values()), list(masks), default='unknown')
+
+def calculate_returns(closes):
+    """
+    Forward (1/5/10/20-day) and backward (1/5-day) returns for every bar of a close
+    price array; NaN where the window runs past the available data
+    """
+    returns = {}
+    for days in (1, 5, 10, 20):
+        forward = np.full(len(closes), np.nan)
+        forward[:-days] = (closes[days:] - closes[:-days]) / closes[:-days]
+        returns[f'forward_{days}d_return'] = forward
+    for days in (1, 5):
+        backward = np.full(len(closes), np.nan)
+        backward[days:] = (closes[days:] - closes[:-days]) / closes[:-days]
+        returns[f'backward_{days}d_return'] = backward
+    return returns
 
 def test_pattern_validation():
     """Test pattern validation with edge cases"""
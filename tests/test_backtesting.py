@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for the backtesting engine on synthetic OHLCV data
+"""
+import sys
+import os
+import gc
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.backtesting import (BacktestConfig, EngulfingBacktester, EngulfingSignal, PositionBook,
+                             engulfing_signals)
+from src.backtesting.position import ExitReason
+
+def _write_stock_files(data_directory: str, n_stocks: int = 8, n_days: int = 250, seed: int = 0):
+    """Write random-walk daily OHLCV CSV files in the downloader's layout"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=n_days)
+    for k in range(n_stocks):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        open_ = close * (1 + rng.normal(0, 0.015, n_days))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n_days)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n_days)))
+        pd.DataFrame({
+            'date': dates.date,
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': rng.integers(100_000, 10_000_000, n_days)
+        }).to_csv(os.path.join(data_directory, f'S{k:02d}_daily.csv'), index=False)
+
+def _random_candles(rng: np.random.Generator, n_days: int = 120) -> pd.DataFrame:
+    """One stock's random-walk OHLCV frame"""
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+    open_ = close * (1 + rng.normal(0, 0.015, n_days))
+    return pd.DataFrame({'date': pd.bdate_range('2023-01-02', periods=n_days), 'open': open_,
+                         'high': np.maximum(open_, close), 'low': np.minimum(open_, close),
+                         'close': close, 'volume': 1_000})
+
+class _CountingDetector:
+    """Wraps a pattern detector and counts detect() calls"""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.calls = 0
+
+    def detect(self, stock_data: pd.DataFrame) -> pd.Series:
+        self.calls += 1
+        return self.detector.detect(stock_data)
+
+def test_parallel_positions_match_sequential():
+    """The per-symbol parallel run records the same trades and position book as the day loop"""
+    with tempfile.TemporaryDirectory() as data_directory:
+        _write_stock_files(data_directory)
+
+        for intraday_stops in (False, True):
+            sequential = EngulfingBacktester(BacktestConfig(max_workers=2, intraday_stops=intraday_stops))
+            sequential_results = sequential.run_backtest(data_directory)
+            parallel = EngulfingBacktester(BacktestConfig(max_workers=2, intraday_stops=intraday_stops,
+                                                          parallel_symbols=True))
+            parallel_results = parallel.run_backtest(data_directory)
+
+            expected = [position.to_dict() for position in sequential.portfolio.closed_positions]
+            assert len(expected) > 0
+            assert [position.to_dict() for position in parallel.portfolio.closed_positions] == expected
+            assert parallel_results['portfolio'] == sequential_results['portfolio']
+            assert parallel.events == sequential.events
+
+            pd.testing.assert_frame_equal(parallel.portfolio.positions_dataframe(),
+                                          sequential.portfolio.positions_dataframe())
+            assert list(parallel.portfolio.open_rows) == list(sequential.portfolio.open_rows)
+            assert parallel.portfolio.symbol_ids == sequential.portfolio.symbol_ids
+
+            # Merged open positions can still be closed through the portfolio
+            for symbol, position in list(parallel.portfolio.positions.items()):
+                record = parallel.portfolio.close_position(symbol, position.entry_date,
+                                                           position.entry_price, ExitReason.PATTERN_EXIT)
+                assert record is not None
+            assert not parallel.portfolio.open_rows
+    print("✓ Parallel positions match the sequential backtest")
+
+def test_signal_cache_reuses_detection():
+    """Repeated signal generation for the same frame runs detection once"""
+    signal_generator = EngulfingSignal()
+    detector = signal_generator.engulfing_detector = _CountingDetector(signal_generator.engulfing_detector)
+    frame = _random_candles(np.random.default_rng(1))
+
+    signals = signal_generator.generate_signals(frame)
+    pd.testing.assert_frame_equal(signal_generator.generate_signals(frame), signals)
+    assert detector.calls == 1
+
+    # An equal but distinct frame is detected afresh
+    pd.testing.assert_frame_equal(signal_generator.generate_signals(frame.copy()), signals)
+    assert detector.calls == 2
+    print("✓ Signal generation reuses cached detection")
+
+def test_signal_cache_is_not_pickled():
+    """Copies sent to worker processes start with an empty cache"""
+    signal_generator = EngulfingSignal()
+    frame = _random_candles(np.random.default_rng(2))
+    signals = signal_generator.generate_signals(frame)
+    assert len(signal_generator._cache) == 1
+
+    copy = pickle.loads(pickle.dumps(signal_generator))
+    assert len(copy._cache) == 0
+    assert len(signal_generator._cache) == 1
+    pd.testing.assert_frame_equal(copy.generate_signals(frame), signals)
+    print("✓ Signal cache is left out of pickled copies")
+
+def test_signal_cache_ignores_reused_frame_ids():
+    """A new frame with the same length and end date never gets another frame's signals"""
+    rng = np.random.default_rng(1)
+    signal_generator = EngulfingSignal()
+
+    for _ in range(50):
+        frame = _random_candles(rng)
+        signals = signal_generator.generate_signals(frame)
+
+        # Mirrored candles on the same dates: every bullish pattern becomes bearish
+        mirrored = frame.assign(open=200 - frame['open'], high=200 - frame['low'],
+                                low=200 - frame['high'], close=200 - frame['close'])
+        del frame
+        gc.collect()
+
+        mirrored_signals = signal_generator.generate_signals(mirrored)
+        pd.testing.assert_frame_equal(mirrored_signals, engulfing_signals(mirrored))
+        if len(signals):
+            assert not signals['signal_type'].equals(mirrored_signals['signal_type'])
+    print("✓ Cached signals are never reused across frames")
+
+def test_intraday_stops_trigger_on_high_low():
+    """Stops trigger on the bar's range and fill at the stop price"""
+    book = PositionBook()
+    rows = np.array([
+        book.open_position('LSL', 1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),   # long, low pierces stop loss
+        book.open_position('LSW', 1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),   # long, high reaches target
+        book.open_position('SSL', -1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),  # short, high pierces stop loss
+        book.open_position('LNO', 1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),   # long, inside both stops
+        book.open_position('LBO', 1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),   # long, bar hits both
+    ])
+    opens = np.array([98.0, 102.0, 100.0, 100.0, 100.0])
+    highs = np.array([99.0, 121.0, 106.0, 110.0, 121.0])
+    lows = np.array([94.0, 101.0, 98.0, 96.0, 94.0])
+
+    codes, prices = book.check_intraday_stops(rows, opens, highs, lows)
+    assert codes.tolist() == [1, 2, 1, 0, 1]
+    np.testing.assert_allclose(prices[codes > 0], [95.0, 120.0, 105.0, 95.0])
+    print("✓ Intraday stops trigger on high/low and fill at the stop price")
+
+def test_intraday_stops_fill_at_open_on_gaps():
+    """A bar that gaps through a stop fills at the open"""
+    book = PositionBook()
+    rows = np.array([
+        book.open_position('LSL', 1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),   # long, gaps below stop loss
+        book.open_position('SSL', -1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),  # short, gaps above stop loss
+        book.open_position('LSW', 1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),   # long, gaps above target
+        book.open_position('SSW', -1, 0, 100.0, 1.0, 100.0, 0.05, 0.20),  # short, gaps below target
+    ])
+    opens = np.array([90.0, 110.0, 125.0, 75.0])
+    highs = np.array([92.0, 112.0, 130.0, 78.0])
+    lows = np.array([88.0, 108.0, 124.0, 70.0])
+
+    codes, prices = book.check_intraday_stops(rows, opens, highs, lows)
+    assert codes.tolist() == [1, 1, 2, 2]
+    np.testing.assert_allclose(prices, [90.0, 110.0, 125.0, 75.0])
+    print("✓ Intraday stops fill at the open when a bar gaps through them")
+
+if __name__ == "__main__":
+    test_intraday_stops_fill_at_open_on_gaps()
+    test_intraday_stops_trigger_on_high_low()
+    test_signal_cache_reuses_detection()
+    test_signal_cache_is_not_pickled()
+    test_signal_cache_ignores_reused_frame_ids()
+    test_parallel_positions_match_sequential()
@@ -90,8 +90,8 @@ def test_corporate_events_downloader():
 
                 # Show sample events
                 sample_events = corporate_events_data.head(3)
-                for _, event in sample_events.iterrows():
-                    print(f"  {event['symbol']}: {event['event_type']} on {event['date']}")
+                for event in sample_events[['symbol', 'event_type', 'date']].itertuples(index=False):
+                    print(f"  {event.symbol}: {event.event_type} on {event.date}")
             else:
                 print("No corporate events data to display")
         else:
@@ -118,24 +118,22 @@ def test_combined_functionality():
 
         print(f"Testing combined download for {test_symbols} from {start_date} to {end_date}")
 
-        # Download both data types
+        # Download both data types (OHLCV frames are saved as each download completes)
         print("\n1. Downloading OHLCV data...")
-        ohlcv_data = downloader.download_multiple_ohlcv(test_symbols, start_date, end_date)
+        ohlcv_files = downloader.download_and_save_ohlcv(test_symbols, start_date, end_date, "data/temp/")
+        if ohlcv_files:
+            print("✓ OHLCV data saved")
 
         print("\n2. Downloading corporate events data...")
         corporate_events_data = downloader.download_multiple_corporate_events(test_symbols)
 
-        # Save both data types
-        if ohlcv_data:
-            downloader.save_ohlcv_data(ohlcv_data, "data/temp/")
-            print("✓ OHLCV data saved")
-
+        # Save corporate events data
         if corporate_events_data:
             downloader.save_corporate_events_data(corporate_events_data, "combined_corporate_events.csv")
             print("✓ Corporate events data saved")
 
         print(f"\nCombined test completed successfully!")
-        print(f"OHLCV stocks: {len(ohlcv_data) if ohlcv_data else 0}")
+        print(f"OHLCV stocks: {len(ohlcv_files)}")
         print(f"Corporate events stocks: {len(corporate_events_data) if corporate_events_data else 0}")
 
     except Exception as e:
@@ -10,12 +10,43 @@ from datetime import datetime, timedelta
 # Add the src directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.data.downloader import PolygonDataDownloader
-from src.data import get_sp500_symbols
-from src.strategies.engulfing import EngulfingPattern
+# Price/volume columns copied into the pattern results files
+RESULT_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def _pattern_rows(data, mask, symbol, pattern_type):
+    """Rows of data where mask is set, in the pattern results file layout"""
+    rows = data.loc[mask.to_numpy()]
+    return pd.DataFrame({
+        'symbol': symbol,
+        'date': pd.to_datetime(rows['date']).dt.strftime('%Y-%m-%d'),
+        'pattern_type': pattern_type,
+        **{column: rows[column] for column in RESULT_COLUMNS}
+    })
+
+def _save_results(results, path):
+    """
+    Write pattern results to a Snappy Parquet dataset with one partition per pattern
+    type (read one back with filters=[('pattern_type', '=', 'bullish_engulfing')]);
+    partitions from an earlier run are replaced
+    """
+    results = results.astype({'symbol': 'category', 'pattern_type': 'category'})
+    results.to_parquet(path, engine='pyarrow', compression='snappy', index=False,
+                       partition_cols=['pattern_type'], existing_data_behavior='delete_matching',
+                       row_group_size=64_000)
+
+def test_engulfing_patterns(verbose: bool = False, debug: bool = False):
+    """
+    Test engulfing pattern detection on S&P 500 stocks
+
+    Args:
+        verbose: Print a progress line and pattern counts for every symbol
+        debug: Print the full traceback if the test fails
+    """
+    # Imported here so collecting this module doesn't load the downloader's HTTP/Arrow stack
+    from src.data.downloader import PolygonDataDownloader
+    from src.data import get_sp500_symbols
+    from src.strategies.engulfing import EngulfingPattern
 
-def test_engulfing_patterns():
-    """Test engulfing pattern detection on S&P 500 stocks"""
     try:
         print("=== Engulfing Pattern Detection Test ===")
 
@@ -44,12 +75,19 @@ def test_engulfing_patterns():
         test_symbols = sp500_symbols
         print(f"Testing with all {len(test_symbols)} S&P 500 stocks")
 
+        # Download every stock up front with one grouped-daily request per trading day,
+        # then split the bars per symbol
+        grouped = downloader.download_grouped_daily(start_date, end_date, symbols=test_symbols)
+        all_data = {symbol: data.reset_index(drop=True)
+                    for symbol, data in grouped.groupby('symbol', sort=False)}
+
         for i, symbol in enumerate(test_symbols, 1):
-            print(f"\n[{i}/{len(test_symbols)}] Processing {symbol}...")
+            if verbose:
+                print(f"\n[{i}/{len(test_symbols)}] Processing {symbol}...")
 
             try:
-                # Download data for this stock
-                data = downloader.download_ohlcv_data(symbol, start_date, end_date)
+                # Downloaded data for this stock (missing if the download failed)
+                data = all_data.get(symbol)
 
                 if data is None or len(data) < 2:
                     print(f"  ⚠️  Insufficient data for {symbol}")
@@ -58,74 +96,43 @@ def test_engulfing_patterns():
                 # Detect patterns
                 pattern_details = pattern_detector.get_pattern_details(data)
 
-                # Process bullish engulfing patterns
-                bullish_patterns = pattern_details['patterns'][pattern_details['patterns'] == 1]
-                for date, pattern in bullish_patterns.items():
-                    # Get the actual date from the data DataFrame
-                    actual_date = data.loc[date, 'date']
-                    # Format date as YYYY-MM-DD string
-                    formatted_date = actual_date.strftime('%Y-%m-%d') if hasattr(actual_date, 'strftime') else str(actual_date)
-
-                    bullish_results.append({
-                        'symbol': symbol,
-                        'date': formatted_date,
-                        'pattern_type': 'bullish_engulfing',
-                        'open': data.loc[date, 'open'],
-                        'high': data.loc[date, 'open'],
-                        'low': data.loc[date, 'low'],
-                        'close': data.loc[date, 'close'],
-                        'volume': data.loc[date, 'volume']
-                    })
-
-                # Process bearish engulfing patterns
-                bearish_patterns = pattern_details['patterns'][pattern_details['patterns'] == -1]
-                for date, pattern in bearish_patterns.items():
-                    # Get the actual date from the data DataFrame
-                    actual_date = data.loc[date, 'date']
-                    # Format date as YYYY-MM-DD string
-                    formatted_date = actual_date.strftime('%Y-%m-%d') if hasattr(actual_date, 'strftime') else str(actual_date)
-
-                    bearish_results.append({
-                        'symbol': symbol,
-                        'date': formatted_date,
-                        'pattern_type': 'bearish_engulfing',
-                        'open': data.loc[date, 'open'],
-                        'high': data.loc[date, 'high'],
-                        'low': data.loc[date, 'low'],
-                        'close': data.loc[date, 'close'],
-                        'volume': data.loc[date, 'volume']
-                    })
-
-                print(f"  ✓ Found {len(bullish_patterns)} bullish, {len(bearish_patterns)} bearish patterns")
-
-            except Exception as e:
+                # Pattern rows as whole-frame slices, one per direction
+                patterns = pattern_details['patterns']
+                bullish = _pattern_rows(data, patterns == 1, symbol, 'bullish_engulfing')
+                bearish = _pattern_rows(data, patterns == -1, symbol, 'bearish_engulfing')
+                bullish_results.append(bullish)
+                bearish_results.append(bearish)
+
+                if verbose:
+                    print(f"  ✓ Found {len(bullish)} bullish, {len(bearish)} bearish patterns")
+
+            except (KeyError, ValueError, TypeError) as e:
+                # Malformed data for one symbol; anything else is a bug and should surface
                 print(f"  ✗ Error processing {symbol}: {e}")
                 continue
 
-        # Save results to CSV files
-        if bullish_results:
-            bullish_df = pd.DataFrame(bullish_results)
-            bullish_file = "data/results/bullish_engulfing_patterns.csv"
-            bullish_df.to_csv(bullish_file, index=False)
-            print(f"\n✓ Saved {len(bullish_results)} bullish patterns to {bullish_file}")
-        else:
+        # Save results to one Parquet dataset partitioned by pattern type
+        bullish_count = sum(len(rows) for rows in bullish_results)
+        bearish_count = sum(len(rows) for rows in bearish_results)
+        total_patterns = bullish_count + bearish_count
+
+        if total_patterns:
+            results_df = pd.concat([rows for rows in bullish_results + bearish_results if len(rows)],
+                                   ignore_index=True)
+            results_dir = "data/results/engulfing_patterns"
+            _save_results(results_df, results_dir)
+            print(f"\n✓ Saved {bullish_count} bullish and {bearish_count} bearish patterns to {results_dir}")
+        if not bullish_count:
             print("\n⚠️  No bullish engulfing patterns found")
-
-        if bearish_results:
-            bearish_df = pd.DataFrame(bearish_results)
-            bearish_file = "data/results/bearish_engulfing_patterns.csv"
-            bearish_df.to_csv(bearish_file, index=False)
-            print(f"✓ Saved {len(bearish_results)} bearish patterns to {bearish_file}")
-        else:
+        if not bearish_count:
             print("⚠️  No bearish engulfing patterns found")
 
         # Summary
-        total_patterns = len(bullish_results) + len(bearish_results)
         print(f"\n=== Summary ===")
         print(f"Total stocks processed: {len(test_symbols)}")
         print(f"Total patterns found: {total_patterns}")
-        print(f"Bullish patterns: {len(bullish_results)}")
-        print(f"Bearish patterns: {len(bearish_results)}")
+        print(f"Bullish patterns: {bullish_count}")
+        print(f"Bearish patterns: {bearish_count}")
 
         if total_patterns > 0:
             print(f"\nPattern detection test PASSED ✓")
@@ -134,8 +141,9 @@ def test_engulfing_patterns():
 
     except Exception as e:
         print(f"✗ Error during testing: {e}")
-        import traceback
-        traceback.print_exc()
+        if debug:
+            import traceback
+            traceback.print_exc()
 
 if __name__ == "__main__":
     test_engulfing_patterns()